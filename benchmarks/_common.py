@@ -0,0 +1,41 @@
+"""Shared helpers for the jetplot benchmark suite."""
+
+from collections.abc import Callable
+from io import BytesIO
+from typing import Any
+
+import matplotlib
+from matplotlib.figure import Figure
+
+matplotlib.use("Agg")
+
+FORMATS = ["png", "pdf", "svg"]
+SIZES = ["small", "large"]
+
+
+def draw(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Figure:
+    """Calls a jetplot plotting function on a new (pyplot-free) figure."""
+    fig = Figure()
+    func(*args, fig=fig, **kwargs)
+    return fig
+
+
+def build(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Callable[[], None]:
+    """Returns a callable that builds a jetplot figure."""
+
+    def run() -> None:
+        draw(func, *args, **kwargs)
+
+    return run
+
+
+def save(fig: Figure, fmt: str) -> int:
+    """Saves a figure to memory, returning the number of bytes written."""
+    buffer = BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.tell()
+
+
+def count_artists(fig: Figure) -> int:
+    """Counts every artist in a figure, including the figure itself."""
+    return len(fig.findobj())
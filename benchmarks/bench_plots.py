@@ -0,0 +1,112 @@
+"""Benchmarks for the plotting functions in jetplot.plots and jetplot.images.
+
+Each case is run at a small and a large input size, and measures the time to
+build the figure, the time to save it in each output format, and the number of
+artists (and bytes) it produces.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+from _common import FORMATS, SIZES, build, count_artists, draw, save
+
+from jetplot import images, plots
+from jetplot.bench import params
+from jetplot.chart_utils import auto_rasterize
+
+RS = np.random.RandomState(0)
+
+
+def _lines(n: int) -> tuple[np.ndarray, list[np.ndarray]]:
+    x = np.linspace(0, 1, n)
+    return x, [np.sin(2 * np.pi * (x + k / 10)) for k in range(10)]
+
+
+# Maps each case to a function of the input size (returning the plotting
+# function, args and kwargs) and the input size to use for each of SIZES.
+CASES: dict[str, tuple[Callable[[int], tuple[Any, tuple, dict]], tuple[int, int]]] = {
+    "hist": (lambda n: (plots.hist, (RS.randn(n),), {"bins": 50}), (1_000, 1_000_000)),
+    "hist2d": (
+        lambda n: (plots.hist2d, (RS.randn(n), RS.randn(n)), {"bins": 50}),
+        (1_000, 1_000_000),
+    ),
+    "errorplot": (
+        lambda n: (plots.errorplot, (np.arange(n), RS.randn(n), 0.1), {}),
+        (100, 100_000),
+    ),
+    "violinplot": (
+        lambda n: (plots.violinplot, (RS.randn(n), 0.0), {}),
+        (1_000, 100_000),
+    ),
+    "bar": (
+        lambda n: (plots.bar, ([str(k) for k in range(n)], RS.rand(n)), {}),
+        (10, 1_000),
+    ),
+    "lines": (lambda n: (plots.lines, _lines(n), {}), (1_000, 100_000)),
+    "waterfall": (lambda n: (plots.waterfall, _lines(n), {}), (1_000, 100_000)),
+    "ridgeline": (
+        lambda n: (
+            plots.ridgeline,
+            (np.linspace(-4, 4, 200), [RS.randn(n) for _ in range(5)], plots.neutral),
+            {},
+        ),
+        (1_000, 100_000),
+    ),
+    "circle": (lambda n: (plots.circle, (), {}), (1, 1)),
+    "ellipse": (
+        lambda n: (plots.ellipse, (RS.randn(n), RS.randn(n)), {}),
+        (1_000, 100_000),
+    ),
+    "img": (
+        lambda n: (images.img, (RS.randn(n, n),), {"cbar": False}),
+        (100, 2_000),
+    ),
+    "fsurface": (
+        lambda n: (images.fsurface, (lambda x, y: np.sin(x) * np.cos(y),), {"n": n}),
+        (100, 1_000),
+    ),
+    "cmat": (lambda n: (images.cmat, (RS.rand(n, n),), {}), (5, 30)),
+}
+
+
+def _figure(case: str, size: str) -> Any:
+    factory, sizes = CASES[case]
+    func, args, kwargs = factory(sizes[SIZES.index(size)])
+    return draw(func, *args, **kwargs)
+
+
+@params(case=list(CASES), size=SIZES)
+def bench_build(case, size):
+    factory, sizes = CASES[case]
+    func, args, kwargs = factory(sizes[SIZES.index(size)])
+    return build(func, *args, **kwargs)
+
+
+@params(case=list(CASES), size=SIZES, fmt=FORMATS)
+def bench_savefig(case, size, fmt):
+    fig = _figure(case, size)
+    return lambda: save(fig, fmt)
+
+
+@params(case=list(CASES), size=SIZES)
+def track_artists(case, size):
+    return count_artists(_figure(case, size))
+
+
+@params(case=list(CASES), size=SIZES, fmt=FORMATS)
+def track_bytes(case, size, fmt):
+    return save(_figure(case, size), fmt)
+
+
+@params(case=["hist2d", "lines", "waterfall", "ellipse"], fmt=["pdf", "svg"])
+def bench_savefig_rasterized(case, fmt):
+    with auto_rasterize(10_000):
+        fig = _figure(case, "large")
+    return lambda: save(fig, fmt)
+
+
+@params(case=["hist2d", "lines", "waterfall", "ellipse"], fmt=["pdf", "svg"])
+def track_bytes_rasterized(case, fmt):
+    with auto_rasterize(10_000):
+        return save(_figure(case, "large"), fmt)
@@ -0,0 +1,38 @@
+"""Benchmarks for jetplot.signals."""
+
+import numpy as np
+
+from jetplot import signals
+from jetplot.bench import params
+
+RS = np.random.RandomState(0)
+
+
+@params(n=[1_000, 1_000_000])
+def bench_smooth(n):
+    x = RS.randn(n)
+    return lambda: signals.smooth(x, sigma=5.0)
+
+
+@params(n=[1_000, 100_000], k=[10, 100])
+def bench_canoncorr(n, k):
+    X, Y = RS.randn(n, k), RS.randn(n, k)
+    return lambda: signals.canoncorr(X, Y)
+
+
+@params(d=[10, 500])
+def bench_participation_ratio(d):
+    C = np.cov(RS.randn(2 * d, d), rowvar=False)
+    return lambda: signals.participation_ratio(C)
+
+
+@params(n=[100, 1_000])
+def bench_stable_rank(n):
+    X = RS.randn(n, n)
+    return lambda: signals.stable_rank(X)
+
+
+@params(n=[1_000, 1_000_000])
+def bench_normalize(n):
+    X = RS.randn(n, 16)
+    return lambda: signals.normalize(X)
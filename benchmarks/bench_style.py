@@ -0,0 +1,55 @@
+"""Benchmarks comparing the default and fast (preview) styles.
+
+Figures are built and saved inside the style context, since some parameters
+(e.g. the DPI and antialiasing) are read when the figure is created and others
+(e.g. path simplification) when it is drawn.
+"""
+
+import numpy as np
+from _common import draw, save
+
+from jetplot import plots, style
+from jetplot.bench import params
+
+RS = np.random.RandomState(0)
+STYLES = {
+    "default": style.light_style(),
+    "fast": style.light_style() | style.fast_style(),
+}
+
+
+def _lines(n: int) -> tuple[np.ndarray, list[np.ndarray]]:
+    x = np.linspace(0, 1, n)
+    return x, [np.sin(2 * np.pi * (x + k / 10)) + 0.1 * RS.randn(n) for k in range(10)]
+
+
+CASES = {
+    "lines": lambda: (plots.lines, _lines(100_000), {}),
+    "hist2d": lambda: (plots.hist2d, (RS.randn(100_000), RS.randn(100_000)), {}),
+    "errorplot": lambda: (
+        plots.errorplot,
+        (np.arange(20_000), RS.randn(20_000), 0.1),
+        {},
+    ),
+}
+
+
+@params(case=list(CASES), style=list(STYLES), fmt=["png", "pdf"])
+def bench_savefig(case, style, fmt):
+    func, args, kwargs = CASES[case]()
+
+    with STYLES[style]:
+        fig = draw(func, *args, **kwargs)
+
+    @STYLES[style]
+    def run():
+        save(fig, fmt)
+
+    return run
+
+
+@params(case=list(CASES), style=list(STYLES))
+def track_png_bytes(case, style):
+    func, args, kwargs = CASES[case]()
+    with STYLES[style]:
+        return save(draw(func, *args, **kwargs), "png")
@@ -0,0 +1,25 @@
+"""Location of jetplot's persistent (on-disk) caches."""
+
+import os
+from pathlib import Path
+
+
+def cache_dir() -> Path | None:
+    """Returns (and creates) the directory used for persistent caches.
+
+    This is ``$JETPLOT_CACHE_DIR`` if set, and otherwise ``jetplot`` inside of
+    ``$XDG_CACHE_HOME`` (which defaults to ``~/.cache``). Returns None if the
+    directory cannot be created or written to (e.g. on a read-only file
+    system), in which case results are computed without a persistent cache.
+    """
+    path = os.environ.get("JETPLOT_CACHE_DIR")
+    if path is None:
+        root = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+        path = Path(root) / "jetplot"
+
+    path = Path(path)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return path if os.access(path, os.W_OK) else None
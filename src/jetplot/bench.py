@@ -0,0 +1,403 @@
+"""Micro-benchmark harness.
+
+Benchmarks can be run from Python with :func:`benchmark`, or collected from
+files of benchmark functions and run from the command line::
+
+    python -m jetplot.bench run benchmarks/ -o results.json
+    python -m jetplot.bench compare baseline.json results.json
+
+Benchmark files contain two kinds of functions. ``bench_*`` functions do any
+setup work and return a zero-argument callable to be timed, while ``track_*``
+functions return a number (e.g. a file size or artist count) that is recorded
+as is. Either can be parameterized with :func:`params`.
+"""
+
+import argparse
+import gc
+import importlib.util
+import itertools
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import numpy as np
+from scipy import stats
+
+from .timepiece import hrtime
+
+__all__ = [
+    "BenchmarkResult",
+    "Comparison",
+    "benchmark",
+    "compare",
+    "load_results",
+    "params",
+    "run_suite",
+    "save_results",
+]
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing samples (in seconds per call) or tracked value of a benchmark."""
+
+    name: str
+    params: dict[str, Any] = field(default_factory=dict)
+    samples: list[float] = field(default_factory=list)
+    number: int = 1
+    outliers: int = 0
+    peak_memory: int | None = None
+    value: float | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}({json.dumps(self.params, sort_keys=True)})"
+
+    @property
+    def mean(self) -> float:
+        return float(np.mean(self.samples)) if self.samples else math.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.std(self.samples, ddof=1)) if len(self.samples) > 1 else 0.0
+
+    @property
+    def median(self) -> float:
+        return float(np.median(self.samples)) if self.samples else math.nan
+
+    def ci(self, confidence: float = 0.95) -> tuple[float, float]:
+        """Confidence interval of the mean time per call."""
+        n = len(self.samples)
+        if n < 2:
+            return self.mean, self.mean
+        half = stats.t.ppf((1 + confidence) / 2, n - 1) * self.std / math.sqrt(n)
+        return self.mean - half, self.mean + half
+
+    def __str__(self) -> str:
+        label = f"{self.name}({', '.join(f'{k}={v}' for k, v in self.params.items())})"
+        if self.value is not None:
+            return f"{label}: {self.value:g}"
+
+        lower, upper = self.ci()
+        text = (
+            f"{label}: {hrtime(self.mean)} ± {hrtime((upper - lower) / 2)} "
+            f"(95% CI, {len(self.samples)} x {self.number} calls)"
+        )
+        if self.peak_memory is not None:
+            text += f", peak memory {self.peak_memory / 2**20:.1f} MiB"
+        return text
+
+
+@dataclass
+class Comparison:
+    """Comparison between a baseline and a candidate benchmark result."""
+
+    key: str
+    baseline: float
+    candidate: float
+    pvalue: float
+    significant: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.candidate / self.baseline if self.baseline else math.inf
+
+    @property
+    def regression(self) -> bool:
+        return self.significant and self.ratio > 1
+
+    def __str__(self) -> str:
+        status = ""
+        if self.significant:
+            status = "  REGRESSION" if self.regression else "  improvement"
+        return f"{self.key}: {self.ratio:.3f}x (p={self.pvalue:.3g}){status}"
+
+
+def _reject_outliers(samples: Sequence[float]) -> list[float]:
+    """Drops samples outside of Tukey's fences (1.5 IQR beyond the quartiles)."""
+    q1, q3 = np.percentile(samples, [25, 75])
+    iqr = q3 - q1
+    return [s for s in samples if q1 - 1.5 * iqr <= s <= q3 + 1.5 * iqr]
+
+
+def benchmark(
+    func: Callable[[], Any],
+    name: str | None = None,
+    repeat: int = 20,
+    number: int | None = None,
+    warmup: int = 1,
+    min_time: float = 0.01,
+    disable_gc: bool = True,
+    reject_outliers: bool = True,
+    memory: bool = False,
+) -> BenchmarkResult:
+    """Times repeated calls to a function.
+
+    Args:
+      func: Zero-argument function to benchmark.
+      name: Name of the benchmark (Default: the function's name).
+      repeat: Number of timing samples to collect (Default: 20).
+      number: Calls per sample. If None, it is calibrated so that each sample
+        takes at least ``min_time`` seconds (Default: None).
+      warmup: Number of samples to run and discard first (Default: 1).
+      min_time: Minimum duration of each sample when calibrating (Default: 0.01).
+      disable_gc: Disable garbage collection while timing (Default: True).
+      reject_outliers: Drop samples outside of Tukey's fences (Default: True).
+      memory: Record the peak memory allocated by one call (Default: False).
+
+    Returns:
+      result: A :class:`BenchmarkResult` with the time per call of each sample.
+    """
+    name = getattr(func, "__name__", "benchmark") if name is None else name
+
+    def run(n: int) -> float:
+        gc_enabled = gc.isenabled()
+        if disable_gc:
+            gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            for _ in range(n):
+                func()
+            return (time.perf_counter_ns() - start) * 1e-9
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    if number is None:
+        number = 1
+        while (elapsed := run(number)) < min_time:
+            number = max(number + 1, int(number * 1.2 * min_time / max(elapsed, 1e-9)))
+
+    for _ in range(warmup):
+        run(number)
+
+    samples = [run(number) / number for _ in range(repeat)]
+    kept = _reject_outliers(samples) if reject_outliers else samples
+
+    peak = None
+    if memory:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        if not tracing:
+            tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=name,
+        samples=kept,
+        number=number,
+        outliers=len(samples) - len(kept),
+        peak_memory=peak,
+    )
+
+
+def params(**grid: Iterable[Any]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator that runs a benchmark for every combination of the given values.
+
+    Example:
+      >>> @params(n=[100, 1000], fmt=["png", "svg"])
+      ... def bench_plot(n, fmt): ...
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        func.__dict__["params"] = {key: list(values) for key, values in grid.items()}
+        return func
+
+    return decorator
+
+
+def _load_module(path: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load benchmarks from {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, str(path.parent))
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(str(path.parent))
+    return module
+
+
+def run_suite(
+    source: str | Path | ModuleType,
+    pattern: str | None = None,
+    verbose: bool = False,
+    **kwargs: Any,
+) -> list[BenchmarkResult]:
+    """Runs the ``bench_*`` and ``track_*`` functions in a module, file or folder.
+
+    Args:
+      source: A module, a python file, or a folder of ``bench*.py`` files.
+      pattern: Only run benchmarks whose name contains this string (Default: None).
+      verbose: Print each result as it completes (Default: False).
+      **kwargs: Forwarded to :func:`benchmark`.
+
+    Returns:
+      results: List of benchmark results.
+    """
+    if not isinstance(source, ModuleType):
+        path = Path(source)
+        if path.is_dir():
+            results = []
+            for file in sorted(path.glob("bench*.py")):
+                results.extend(run_suite(file, pattern, verbose, **kwargs))
+            return results
+        source = _load_module(path)
+
+    results = []
+    for name in dir(source):
+        func = getattr(source, name)
+        if not callable(func) or not name.startswith(("bench_", "track_")):
+            continue
+        if pattern is not None and pattern not in name:
+            continue
+
+        grid = getattr(func, "params", {})
+        for values in itertools.product(*grid.values()):
+            kw = dict(zip(grid.keys(), values, strict=True))
+            if name.startswith("track_"):
+                result = BenchmarkResult(name=name, value=float(func(**kw)))
+            else:
+                result = benchmark(func(**kw), name=name, **kwargs)
+            result.params = kw
+            results.append(result)
+
+            if verbose:
+                print(result)
+
+    return results
+
+
+def save_results(results: Iterable[BenchmarkResult], filepath: str | Path) -> None:
+    """Saves benchmark results, along with information about the environment, as JSON."""
+    import matplotlib
+
+    from . import __version__
+
+    metadata = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "jetplot": __version__,
+    }
+    with open(filepath, "w") as f:
+        json.dump(
+            {"metadata": metadata, "results": [asdict(r) for r in results]}, f, indent=2
+        )
+
+
+def load_results(filepath: str | Path) -> list[BenchmarkResult]:
+    """Loads benchmark results saved with :func:`save_results`."""
+    with open(filepath) as f:
+        return [BenchmarkResult(**r) for r in json.load(f)["results"]]
+
+
+def compare(
+    baseline: Iterable[BenchmarkResult],
+    candidate: Iterable[BenchmarkResult],
+    alpha: float = 0.05,
+    threshold: float = 0.05,
+) -> list[Comparison]:
+    """Compares two sets of benchmark results.
+
+    Timings are compared with Welch's t-test, and a difference is flagged as
+    significant if ``p < alpha`` and the means differ by more than ``threshold``
+    (relative to the baseline). Tracked values are flagged whenever they differ
+    by more than ``threshold``.
+
+    Args:
+      baseline: Results to compare against.
+      candidate: New results.
+      alpha: Significance level (Default: 0.05).
+      threshold: Minimum relative change to flag (Default: 0.05).
+
+    Returns:
+      comparisons: One :class:`Comparison` for each benchmark present in both.
+    """
+    reference = {r.key: r for r in baseline}
+    comparisons = []
+
+    for new in candidate:
+        old = reference.get(new.key)
+        if old is None:
+            continue
+
+        if new.value is not None and old.value is not None:
+            before, after, pvalue = old.value, new.value, 0.0
+        else:
+            before, after = old.mean, new.mean
+            pvalue = float(
+                stats.ttest_ind(old.samples, new.samples, equal_var=False).pvalue
+            )
+
+        change = abs(after - before) / abs(before) if before else math.inf
+        significant = pvalue < alpha and change > threshold
+        comparisons.append(Comparison(new.key, before, after, pvalue, significant))
+
+    return comparisons
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line interface for running and comparing benchmarks."""
+    parser = argparse.ArgumentParser(prog="python -m jetplot.bench")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmark files or folders.")
+    run_parser.add_argument("paths", nargs="+")
+    run_parser.add_argument("-o", "--output", help="Save results to this JSON file.")
+    run_parser.add_argument("-k", "--pattern", help="Only run matching benchmarks.")
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument("--memory", action="store_true")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--alpha", type=float, default=0.05)
+    compare_parser.add_argument("--threshold", type=float, default=0.05)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = []
+        for path in args.paths:
+            results.extend(
+                run_suite(
+                    path,
+                    args.pattern,
+                    verbose=True,
+                    repeat=args.repeat,
+                    memory=args.memory,
+                )
+            )
+        if args.output:
+            save_results(results, args.output)
+        return 0
+
+    comparisons = compare(
+        load_results(args.baseline),
+        load_results(args.candidate),
+        alpha=args.alpha,
+        threshold=args.threshold,
+    )
+    for comparison in comparisons:
+        print(comparison)
+    return int(any(c.regression for c in comparisons))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,28 @@
 """Plotting utils."""
 
-from collections.abc import Callable
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from functools import partial, wraps
+from io import BytesIO
 from typing import Any, Literal
 
 import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib import rcParams
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
+from matplotlib.axis import Tick
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import Collection, QuadMesh
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
 
 __all__ = [
     "noticks",
@@ -15,12 +31,410 @@ __all__ = [
     "plotwrapper",
     "figwrapper",
     "axwrapper",
+    "FigurePool",
+    "pooled",
+    "instrument",
+    "RenderRecord",
+    "auto_rasterize",
     "get_bounds",
     "yclamp",
     "xclamp",
 ]
 
 
+@dataclass
+class RenderRecord:
+    """Instrumentation record for a single call to a wrapped plotting function.
+
+    Attributes:
+      name: Name of the plotting function.
+      prep_time: Time (in seconds) spent in the function itself, building artists.
+      artists: Number of artists created by the function, by type.
+      draw_time: Total time (in seconds) spent drawing those artists.
+      draws: Number of times the figure has been drawn.
+    """
+
+    name: str
+    prep_time: float
+    artists: dict[str, int] = field(default_factory=dict)
+    draw_time: float = 0.0
+    draws: int = 0
+
+
+# records of the innermost instrument() block (per thread and asyncio task),
+# and the functions that stop timing the draws of each record
+_collector: ContextVar[tuple[list[RenderRecord], list[Callable[[], None]]] | None] = (
+    ContextVar("jetplot_instrument", default=None)
+)
+
+
+@contextmanager
+def instrument() -> Iterator[list[RenderRecord]]:
+    """Records instrumentation for plotting functions called within the block.
+
+    Every call to a function decorated with :func:`plotwrapper` or
+    :func:`figwrapper` appends a :class:`RenderRecord` to the yielded list. Draw
+    times accumulate whenever the figure is drawn (e.g. saved) within the
+    block. On exit, the artists' draw timers are removed.
+
+    Example:
+      >>> with instrument() as records:
+      ...     fig = lines(np.random.randn(10, 1000)).get_figure()
+      ...     fig.savefig("lines.png")
+      >>> records[0].draw_time
+    """
+    records: list[RenderRecord] = []
+    stops: list[Callable[[], None]] = []
+    token = _collector.set((records, stops))
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+        for stop in reversed(stops):
+            stop()
+
+
+def _children(artist: Artist) -> list[Artist]:
+    # ticks are skipped, as axes create them lazily whenever the limits change
+    return [child for child in artist.get_children() if not isinstance(child, Tick)]
+
+
+def _findobj(root: Artist) -> list[Artist]:
+    """Returns root and all of the artists under it, excluding ticks."""
+    return [root] + [a for child in _children(root) for a in _findobj(child)]
+
+
+def _new_artists(root: Artist, existing: set[Artist]) -> list[Artist]:
+    """Returns the outermost artists under root that are not in existing."""
+    if root not in existing:
+        return [root]
+    return [a for child in _children(root) for a in _new_artists(child, existing)]
+
+
+def _timed_draw(
+    artist: Artist, record: RenderRecord, drawn: list[bool]
+) -> Callable[[], None]:
+    """Times the draws of an artist, until the returned function is called."""
+    previous = artist.__dict__.get("draw")
+    draw = artist.draw
+
+    @wraps(draw)
+    def wrapper(*args, **kwargs):
+        drawn[0] = True
+        start = time.perf_counter()
+        try:
+            return draw(*args, **kwargs)
+        finally:
+            record.draw_time += time.perf_counter() - start
+
+    artist.draw = wrapper  # pyrefly: ignore
+
+    def undo() -> None:
+        # the wrapper is an instance attribute, which figures cannot pickle
+        if artist.__dict__.get("draw") is wrapper:
+            if previous is None:
+                del artist.draw
+            else:
+                artist.draw = previous  # pyrefly: ignore
+
+    return undo
+
+
+# rasterization threshold used when a wrapped function is not given one
+_rasterize: ContextVar[int | None] = ContextVar("jetplot_rasterize", default=None)
+
+
+@contextmanager
+def auto_rasterize(threshold: int | None = 10_000) -> Iterator[None]:
+    """Rasterizes dense artists created by plotting functions within the block.
+
+    Lines, collections and patches with more than ``threshold`` vertices (or
+    elements, e.g. scatter points or mesh cells) that are created by functions
+    decorated with :func:`plotwrapper` or :func:`figwrapper` are rasterized when
+    saved to a vector format, while axes, ticks and text stay vector graphics.
+    The threshold can also be passed to a single call as ``rasterize=...``.
+
+    Example:
+      >>> with auto_rasterize(10_000):
+      ...     lines(x, ys).get_figure().savefig("lines.pdf")
+    """
+    token = _rasterize.set(threshold)
+    try:
+        yield
+    finally:
+        _rasterize.reset(token)
+
+
+def _num_elements(artist: Artist) -> int:
+    """Number of vertices or elements (points, mesh cells) drawn by an artist."""
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())  # pyrefly: ignore
+    if isinstance(artist, QuadMesh):
+        rows, cols = artist.get_coordinates().shape[:2]
+        return (rows - 1) * (cols - 1)
+    if isinstance(artist, Collection):
+        vertices = sum(len(path.vertices) for path in artist.get_paths())
+        return max(len(artist.get_offsets()), vertices)
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+
+# draw_event callbacks connected by instrumented calls, for each figure
+_draw_cids: weakref.WeakKeyDictionary[Figure, list[int]] = weakref.WeakKeyDictionary()
+
+
+def _disconnect_records(fig: Figure) -> None:
+    """Stops instrument() records from counting further draws of a figure."""
+    for cid in _draw_cids.pop(fig, []):
+        fig.canvas.mpl_disconnect(cid)
+
+
+def _call(fun: Callable[..., Any], args: Any, kwargs: dict[str, Any]) -> Any:
+    """Calls a wrapped plotting function, rasterizing dense artists and recording
+    instrumentation if enabled."""
+    threshold = kwargs.pop("rasterize", _rasterize.get())
+    collector = _collector.get()
+    if collector is None and threshold is None:
+        return fun(*args, **kwargs)
+
+    fig: Figure = kwargs["fig"]
+    existing = set(_findobj(fig))
+
+    start = time.perf_counter()
+    result = fun(*args, **kwargs)
+    prep_time = time.perf_counter() - start
+
+    created = [a for a in _findobj(fig) if a not in existing]
+    if threshold is not None:
+        for artist in created:
+            if _num_elements(artist) > threshold:
+                artist.set_rasterized(True)
+
+    if collector is None:
+        return result
+
+    records, stops = collector
+    record = RenderRecord(fun.__name__, prep_time)
+    record.artists = dict(Counter(type(a).__name__ for a in created))
+    drawn = [False]
+    undos = [_timed_draw(a, record, drawn) for a in _new_artists(fig, existing)]
+
+    def stop() -> None:
+        fig.canvas.mpl_disconnect(cid)
+        cids = _draw_cids.get(fig, [])
+        if cid in cids:
+            cids.remove(cid)
+        for undo in reversed(undos):
+            undo()
+        undos.clear()
+
+    def on_draw(_: Any) -> None:
+        # once a draw no longer includes the artists (e.g. the figure was
+        # cleared), stop counting and let go of the record
+        if drawn[0]:
+            record.draws += 1
+            drawn[0] = False
+        else:
+            stop()
+
+    cid = fig.canvas.mpl_connect("draw_event", on_draw)
+    _draw_cids.setdefault(fig, []).append(cid)
+    records.append(record)
+    stops.append(stop)
+
+    return result
+
+
+class FigurePool:
+    """A pool of reusable, pyplot-free figures for high-volume rendering.
+
+    Figures are created with an Agg canvas and are never registered with
+    pyplot, so they are garbage collected normally. Released figures are
+    cleared and kept (up to ``maxsize`` per figure size and DPI) to be handed
+    out again by :meth:`acquire`.
+
+    Example:
+      >>> pool = FigurePool()
+      >>> png = pool.render(plots.lines, x, ys, figsize=(3, 2))
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self.maxsize = maxsize
+        self.created = 0
+        self.reused = 0
+        self._free: dict[tuple[float, ...], list[Figure]] = defaultdict(list)
+        # figures handed out, with the lease (a token of their user) of each
+        self._in_use: dict[int, tuple[Figure, object]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(figsize: Sequence[float] | None, dpi: float | None) -> tuple[float, ...]:
+        width, height = rcParams["figure.figsize"] if figsize is None else figsize
+        return float(width), float(height), float(dpi or rcParams["figure.dpi"])
+
+    def acquire(
+        self, figsize: Sequence[float] | None = None, dpi: float | None = None
+    ) -> Figure:
+        """Returns an empty figure with the given size (Default: rcParams)."""
+        return self._acquire(figsize, dpi, object())
+
+    def _acquire(
+        self, figsize: Sequence[float] | None, dpi: float | None, lease: object
+    ) -> Figure:
+        key = self._key(figsize, dpi)
+        with self._lock:
+            free = self._free[key]
+            fig = free.pop() if free else None
+            if fig is None:
+                self.created += 1
+            else:
+                self.reused += 1
+
+        if fig is None:
+            fig = Figure(figsize=key[:2], dpi=key[2])
+            FigureCanvasAgg(fig)
+        else:
+            # clear() keeps figure-level settings, which may have been
+            # changed by the previous user or by a style
+            fig.set_facecolor(rcParams["figure.facecolor"])
+            fig.set_edgecolor(rcParams["figure.edgecolor"])
+            fig.subplotpars.update(
+                **{k: rcParams[f"figure.subplot.{k}"] for k in _SUBPLOT_PARAMS}
+            )
+
+        with self._lock:
+            self._in_use[id(fig)] = (fig, lease)
+        return fig
+
+    def release(self, fig: Figure) -> None:
+        """Clears a figure acquired from this pool and returns it to the pool."""
+        self._release(fig)
+
+    def _release(self, fig: Figure, lease: object | None = None) -> None:
+        """Releases a figure, if it is in use (by the given lease)."""
+        with self._lock:
+            entry = self._in_use.get(id(fig))
+            if entry is None or (lease is not None and entry[1] is not lease):
+                return
+            del self._in_use[id(fig)]
+
+        _disconnect_records(fig)
+        fig.clear()
+        key = self._key(fig.get_size_inches(), fig.dpi)
+        with self._lock:
+            if len(self._free[key]) < self.maxsize:
+                self._free[key].append(fig)
+
+    def _release_lease(self, lease: object) -> None:
+        """Releases the figures that are still in use by a lease."""
+        with self._lock:
+            figures = [fig for fig, owner in self._in_use.values() if owner is lease]
+        for fig in figures:
+            self._release(fig, lease)
+
+    def release_all(self) -> None:
+        """Returns every figure that is still in use to the pool."""
+        with self._lock:
+            figures = [fig for fig, _ in self._in_use.values()]
+        for fig in figures:
+            self.release(fig)
+
+    @contextmanager
+    def figure(
+        self, figsize: Sequence[float] | None = None, dpi: float | None = None
+    ) -> Iterator[Figure]:
+        """Context manager that acquires a figure and releases it afterwards."""
+        fig = self.acquire(figsize, dpi)
+        try:
+            yield fig
+        finally:
+            self.release(fig)
+
+    def save(self, fig: Figure, fname: Any, **kwargs: Any) -> None:
+        """Saves a figure (see ``Figure.savefig``) and returns it to the pool."""
+        try:
+            fig.savefig(fname, **kwargs)
+        finally:
+            self.release(fig)
+
+    def render(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        fmt: str = "png",
+        figsize: Sequence[float] | None = None,
+        dpi: float | None = None,
+        **kwargs: Any,
+    ) -> bytes:
+        """Calls a plotting function on a pooled figure and returns the saved image.
+
+        Args:
+          func: A plotting function that accepts a ``fig`` keyword argument,
+            e.g. one decorated with :func:`plotwrapper` or :func:`figwrapper`.
+          *args: Positional arguments for ``func``.
+          fmt: Image format (Default: "png").
+          figsize: Figure size (Default: rcParams["figure.figsize"]).
+          dpi: Figure resolution (Default: rcParams["figure.dpi"]).
+          **kwargs: Keyword arguments for ``func``.
+        """
+        buffer = BytesIO()
+        with self.figure(figsize, dpi) as fig:
+            func(*args, fig=fig, **kwargs)
+            fig.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+
+    def clear(self) -> None:
+        """Drops the idle figures in the pool."""
+        with self._lock:
+            self._free.clear()
+
+
+_SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+
+# pool that wrapped functions take new figures from (per thread and asyncio
+# task), with the lease that the current pooled() block acquires figures with
+_active_pool: ContextVar[tuple[FigurePool, object] | None] = ContextVar(
+    "jetplot_pool", default=None
+)
+
+
+@contextmanager
+def pooled(pool: FigurePool | None = None) -> Iterator[FigurePool]:
+    """Makes wrapped plotting functions draw on pooled figures within the block.
+
+    Functions decorated with :func:`plotwrapper` or :func:`figwrapper` that are
+    not given a figure (or axes) acquire one from the pool instead of creating
+    a pyplot figure. Figures are returned to the pool by
+    :meth:`FigurePool.save`, or when the block exits, so figures (and axes)
+    must not be used after that. The block only applies to the current thread
+    (or asyncio task), and only releases the figures acquired within it.
+
+    Example:
+      >>> with pooled() as pool:
+      ...     for k, ys in enumerate(batch):
+      ...         ax = plots.lines(x, ys, figsize=(3, 2))
+      ...         pool.save(ax.get_figure(), f"lines_{k}.png")
+    """
+    pool = FigurePool() if pool is None else pool
+    lease = object()
+    token = _active_pool.set((pool, lease))
+    try:
+        yield pool
+    finally:
+        _active_pool.reset(token)
+        pool._release_lease(lease)
+
+
+def _new_figure(figsize: Sequence[float] | None) -> Figure:
+    active = _active_pool.get()
+    if active is None:
+        return plt.figure(figsize=figsize)
+
+    pool, lease = active
+    return pool._acquire(figsize, None, lease)
+
+
 def figwrapper(fun: Callable[..., Any]) -> Callable[..., Any]:
     """Decorator that adds figure handles to the kwargs of a function."""
 
@@ -28,8 +442,8 @@ def figwrapper(fun: Callable[..., Any]) -> Callable[..., Any]:
     def wrapper(*args, **kwargs):
         if "fig" not in kwargs:
             figsize = kwargs.get("figsize", None)
-            kwargs["fig"] = plt.figure(figsize=figsize)
-        return fun(*args, **kwargs)
+            kwargs["fig"] = _new_figure(figsize)
+        return _call(fun, args, kwargs)
 
     return wrapper
 
@@ -42,13 +456,13 @@ def plotwrapper(fun: Callable[..., Any]) -> Callable[..., Any]:
         if "ax" not in kwargs:
             if "fig" not in kwargs:
                 figsize = kwargs.get("figsize", None)
-                kwargs["fig"] = plt.figure(figsize=figsize)
+                kwargs["fig"] = _new_figure(figsize)
             kwargs["ax"] = kwargs["fig"].add_subplot(111)
         else:
             if "fig" not in kwargs:
                 kwargs["fig"] = kwargs["ax"].get_figure()
 
-        return fun(*args, **kwargs)
+        return _call(fun, args, kwargs)
 
     return wrapper
 
@@ -1,32 +1,212 @@
 """Colorschemes"""
 
-from typing import cast
+import hashlib
+import os
+import tempfile
+from functools import lru_cache, wraps
+from typing import Any, cast
 
+import matplotlib
 import numpy as np
-from matplotlib import cm
 from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
-from matplotlib.colors import LinearSegmentedColormap, to_hex
+from matplotlib.colors import (
+    Colormap,
+    LinearSegmentedColormap,
+    Normalize,
+    to_rgba,
+    to_rgba_array,
+)
 from matplotlib.figure import Figure
 from matplotlib.typing import ColorType
+from numpy.typing import ArrayLike, NDArray
+from scipy.spatial import cKDTree
 
+from ._cache import cache_dir
 from .chart_utils import noticks
 
-__all__ = ["Palette", "cubehelix", "cmap_colors"]
+__all__ = [
+    "Palette",
+    "cubehelix",
+    "cubehelix_batch",
+    "cubehelix_inverse",
+    "cmap_colors",
+    "distinct_colors",
+]
+
+
+# maps ASCII codes of hexadecimal digits to their values (and everything else to 255)
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+for _value, _digit in enumerate("0123456789abcdef"):
+    _HEX_VALUES[ord(_digit)] = _HEX_VALUES[ord(_digit.upper())] = _value
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def _parse_hex(colors: list[str]) -> NDArray[np.float64] | None:
+    """Vectorized conversion of '#rrggbb' or '#rrggbbaa' strings to RGBA values.
+
+    Returns None if the colors are not all hex strings of the same length.
+    """
+    if not colors or len({len(c) for c in colors}) != 1 or len(colors[0]) not in (7, 9):
+        return None
+
+    try:
+        data = "".join(colors).encode("ascii")
+    except UnicodeEncodeError:
+        return None
+
+    chars = np.frombuffer(data, dtype=np.uint8).reshape(len(colors), -1)
+    nibbles = _HEX_VALUES[chars[:, 1:]].astype(np.uint16)
+    if np.any(chars[:, 0] != ord("#")) or np.any(nibbles == 255):
+        return None
+
+    values = (nibbles[:, 0::2] * 16 + nibbles[:, 1::2]) / 255
+    if values.shape[1] == 3:
+        values = np.column_stack([values, np.ones(len(colors))])
+    return values
+
+
+def _to_rgba_array(colors: list[Any]) -> NDArray[np.float64]:
+    """Converts a list of colors to an (N, 4) array of RGBA values."""
+    if all(isinstance(c, str) for c in colors):
+        rgba = _parse_hex(colors)
+        if rgba is not None:
+            return rgba
+    else:
+        try:
+            return to_rgba_array(np.asarray(colors, dtype=np.float64))
+        except (TypeError, ValueError):
+            pass
+
+    return to_rgba_array(colors)
+
+
+def _to_hex(rgba: NDArray[np.floating]) -> list[str]:
+    """Vectorized conversion of RGB(A) values to '#rrggbb' strings."""
+    values = np.round(np.asarray(rgba, dtype=np.float64)[:, :3] * 255).astype(np.uint8)
+    chars = np.empty((len(values), 7), dtype=np.uint8)
+    chars[:, 0] = ord("#")
+    chars[:, 1::2] = _HEX_DIGITS[values >> 4]
+    chars[:, 2::2] = _HEX_DIGITS[values & 15]
+    return chars.view("S7").ravel().astype(str).tolist()
 
 
 class Palette(list[ColorType]):
-    """Color palette based on a list of values."""
+    """Color palette based on a list of values.
+
+    In addition to the list of colors, a palette lazily computes (and caches
+    until the list is modified) a compact (N x 4) float32 array of RGBA values,
+    available as :attr:`rgba`, that can be passed directly to Matplotlib (e.g.
+    to ``Collection.set_facecolors``) without converting colors one at a time.
+    """
+
+    _rgba: NDArray[np.float32] | None = None
+    _luts: dict[tuple[int, Any], NDArray[Any]] | None = None
+
+    @classmethod
+    def from_rgba(cls, rgba: NDArray[np.floating]) -> "Palette":
+        """Creates a palette from an (N x 3) or (N x 4) array of RGB(A) values."""
+        rgba = to_rgba_array(np.asarray(rgba)).astype(np.float32)
+        palette = cls(rgba)
+        rgba.flags.writeable = False
+        palette._rgba = rgba
+        return palette
+
+    @property
+    def rgba(self) -> NDArray[np.float32]:
+        """Return the palette colors as a read-only (N x 4) float32 array."""
+        if self._rgba is None:
+            rgba = _to_rgba_array(self).astype(np.float32).reshape(-1, 4)
+            rgba.flags.writeable = False
+            self._rgba = rgba
+        return self._rgba
 
     @property
     def hex(self) -> "Palette":
         """Return the palette colors as hexadecimal strings."""
-        return Palette([to_hex(rgb) for rgb in self])  # pyrefly: ignore
+        return Palette(_to_hex(_to_rgba_array(self)) if self else [])
 
     @property
     def cmap(self) -> LinearSegmentedColormap:
-        """Return the palette as a Matplotlib colormap."""
-        return LinearSegmentedColormap.from_list("", self)
+        """Return the palette as a Matplotlib colormap.
+
+        Colormaps are built once for each set of colors, and every access
+        returns a copy, which can be modified (e.g. with ``set_bad``).
+        """
+        return _palette_cmap(self.rgba.tobytes()).copy()
+
+    def lut(self, size: int = 256, dtype: Any = np.float32) -> NDArray[Any]:
+        """Return a (size + 1, 4) lookup table of colors sampled from :attr:`cmap`.
+
+        The last row holds the (transparent) color used for NaN values. Values
+        are in [0, 1] for floating point dtypes and [0, 255] for uint8. Lookup
+        tables are cached until the palette is modified.
+        """
+        if self._luts is None:
+            self._luts = {}
+
+        key = (size, np.dtype(dtype))
+        if key not in self._luts:
+            table = np.zeros((size + 1, 4))
+            table[:size] = self.cmap(np.linspace(0.0, 1.0, size))
+            if np.issubdtype(dtype, np.integer):
+                table = np.round(table * 255)
+            table = table.astype(dtype)
+            table.flags.writeable = False
+            self._luts[key] = table
+
+        return self._luts[key]
+
+    def map(
+        self,
+        values: ArrayLike,
+        vmin: float | None = None,
+        vmax: float | None = None,
+        norm: Normalize | None = None,
+        lut_size: int = 256,
+        dtype: Any = np.float32,
+        out: NDArray[Any] | None = None,
+    ) -> NDArray[Any]:
+        """Map data values to colors using a precomputed lookup table.
+
+        This is equivalent to ``self.cmap(norm(values))``, but only requires
+        computing an index into a cached lookup table, followed by a single
+        vectorized gather, for each value.
+
+        Args:
+          values: Data values to map to colors.
+          vmin: Value mapped to the first color (Default: None, the minimum value).
+          vmax: Value mapped to the last color (Default: None, the maximum value).
+          norm: Matplotlib normalization to apply instead of vmin/vmax (Default: None).
+          lut_size: Number of colors in the lookup table (Default: 256).
+          dtype: Either a floating point dtype (for values in [0, 1]) or uint8
+            (for values in [0, 255]) (Default: float32).
+          out: Optional array with shape ``values.shape + (4,)`` to store the
+            colors in (Default: None).
+
+        Returns:
+          colors: Array of RGBA colors, with shape ``values.shape + (4,)``.
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        if norm is not None:
+            scaled = np.ma.filled(norm(values), np.nan).astype(np.float64)
+            scaled *= lut_size
+        else:
+            vmin = np.nanmin(values) if vmin is None else vmin
+            vmax = np.nanmax(values) if vmax is None else vmax
+            scaled = values - vmin
+            scaled *= lut_size / (vmax - vmin) if vmax > vmin else 0.0
+
+        bad = np.isnan(scaled)
+        np.clip(scaled, 0, lut_size - 1, out=scaled)
+        with np.errstate(invalid="ignore"):
+            index = scaled.astype(np.int32)
+        if bad.any():
+            index[bad] = lut_size
+
+        # indices are already in bounds, and mode="clip" avoids buffering into out
+        return np.take(self.lut(lut_size, dtype), index, axis=0, out=out, mode="clip")
 
     def plot(self, figsize: tuple[int, int] = (5, 1)) -> tuple[Figure, list[Axes]]:
         """Visualize the colors in the palette."""
@@ -39,6 +219,39 @@ class Palette(list[ColorType]):
         return fig, cast(list[Axes], axs)
 
 
+def _invalidates_rgba(method: Any) -> Any:
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._rgba = self._luts = None
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _method in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(Palette, _method, _invalidates_rgba(getattr(list, _method)))
+
+
+@lru_cache(maxsize=128)
+def _palette_cmap(rgba: bytes) -> LinearSegmentedColormap:
+    # only copies are handed out, so the lookup table of this one is never built
+    colors = np.frombuffer(rgba, dtype=np.float32).reshape(-1, 4)
+    return LinearSegmentedColormap.from_list("", colors.astype(np.float64))
+
+
 def cubehelix(
     n: int,
     vmin: float = 0.85,
@@ -61,14 +274,232 @@ def cubehelix(
     return Palette(colors)
 
 
+def cubehelix_batch(
+    n: int,
+    vmin: ArrayLike = 0.85,
+    vmax: ArrayLike = 0.15,
+    gamma: ArrayLike = 1.0,
+    start: ArrayLike = 0.0,
+    rot: ArrayLike = 0.4,
+    hue: ArrayLike = 0.8,
+) -> NDArray[np.float64]:
+    """Cubehelix colors for many parameter settings at once.
+
+    Takes the same parameters as :func:`cubehelix`, except that each can be an
+    array. Parameters are broadcast against each other, and all palettes are
+    computed in a single vectorized operation.
+
+    Returns:
+      colors: Array with shape ``(n_params, n, 3)``, where ``n_params`` is the
+        size of the broadcast parameters.
+    """
+    vmin, vmax, gamma, start, rot, hue = (
+        p.ravel()[:, None]
+        for p in np.broadcast_arrays(
+            *(
+                np.asarray(p, dtype=np.float64)
+                for p in (vmin, vmax, gamma, start, rot, hue)
+            )
+        )
+    )
+    lambda_ = np.linspace(vmin[:, 0], vmax[:, 0], n, axis=1)
+    x = lambda_**gamma
+    phi = 2 * np.pi * (start / 3 + rot * lambda_)
+
+    alpha = 0.5 * hue * x * (1.0 - x)
+    A = np.array([[-0.14861, 1.78277], [-0.29227, -0.90649], [1.97294, 0.0]])
+    b = np.stack([np.cos(phi), np.sin(phi)], axis=-1)
+
+    return x[..., None] + alpha[..., None] * (b @ A.T)
+
+
+@lru_cache(maxsize=32)
+def _cubehelix_tree(
+    gamma: float, start: float, rot: float, hue: float, resolution: int
+) -> cKDTree:
+    table = cubehelix_batch(resolution, 0.0, 1.0, gamma, start, rot, hue)[0]
+    return cKDTree(table)
+
+
+def cubehelix_inverse(
+    colors: ArrayLike,
+    gamma: float = 1.0,
+    start: float = 0.0,
+    rot: float = 0.4,
+    hue: float = 0.8,
+    resolution: int = 4096,
+    return_distance: bool = False,
+) -> Any:
+    """Find the cubehelix parameter (lambda) that best matches each color.
+
+    Colors are matched to a dense table of the cubehelix curve (with lambda
+    between 0 and 1), using a KD-tree that is cached for each setting of the
+    parameters.
+
+    Args:
+      colors: Array of RGB(A) values with shape (..., 3) or (..., 4).
+      gamma, start, rot, hue: Parameters of the cubehelix curve (see :func:`cubehelix`).
+      resolution: Number of entries in the lookup table (Default: 4096).
+      return_distance: Also return the RGB distance to the nearest table entry.
+
+    Returns:
+      lambda: Array with shape (...) of values between 0 and 1. If
+        ``return_distance`` is True, a tuple of ``(lambda, distance)``.
+    """
+    rgb = np.asarray(colors, dtype=np.float64)[..., :3]
+    tree = _cubehelix_tree(gamma, start, rot, hue, resolution)
+    distance, index = tree.query(rgb)
+    lambda_ = np.asarray(index) / (resolution - 1)
+    return (lambda_, distance) if return_distance else lambda_
+
+
+@lru_cache(maxsize=256)
+def _sample_cmap(cmap: str, n: int, vmin: float, vmax: float) -> NDArray[np.floating]:
+    """Samples a registered colormap, returning a (cached) read-only array."""
+    colors = matplotlib.colormaps[cmap](np.linspace(vmin, vmax, n))
+    colors.flags.writeable = False
+    return colors
+
+
 def cmap_colors(
-    cmap: str,
+    cmap: str | Colormap,
     n: int,
     vmin: float = 0.0,
     vmax: float = 1.0,
 ) -> Palette:
-    """Extract ``n`` colors from a Matplotlib colormap."""
-    return Palette(getattr(cm, cmap)(np.linspace(vmin, vmax, n)))
+    """Extract ``n`` colors from a Matplotlib colormap.
+
+    Colormaps given by name are looked up in the Matplotlib colormap registry,
+    and their samples are cached (as read-only arrays).
+    """
+    if isinstance(cmap, str):
+        return Palette(_sample_cmap(cmap, n, vmin, vmax))
+    return Palette(cmap(np.linspace(vmin, vmax, n)))
+
+
+def _srgb_to_oklab(rgb: ArrayLike) -> NDArray[np.float64]:
+    """Converts sRGB values in [0, 1], with shape (..., 3), to the OKLab space [1]_.
+
+    References:
+      .. [1] Ottosson, Björn. "A perceptual color space for image processing."
+       (2020) https://bottosson.github.io/posts/oklab/
+    """
+    rgb = np.asarray(rgb, dtype=np.float64)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    lms = (
+        linear
+        @ np.array(
+            [
+                [0.4122214708, 0.5363325363, 0.0514459929],
+                [0.2119034982, 0.6806995451, 0.1073969566],
+                [0.0883024619, 0.2817188376, 0.6299787005],
+            ]
+        ).T
+    )
+    return (
+        np.cbrt(lms)
+        @ np.array(
+            [
+                [0.2104542553, 0.7936177850, -0.0040720468],
+                [1.9779984951, -2.4285922050, 0.4505937099],
+                [0.0259040371, 0.7827717662, -0.8086757660],
+            ]
+        ).T
+    )
+
+
+def _farthest_points(
+    candidates: NDArray[np.float64], n: int, exclude: NDArray[np.float64]
+) -> NDArray[np.intp]:
+    """Greedy farthest-point sampling of n candidates (away from the excluded points)."""
+    if n > len(candidates):
+        raise ValueError(f"Cannot pick {n} colors from {len(candidates)} candidates")
+
+    distance = np.full(len(candidates), np.inf)
+    for point in exclude:
+        np.minimum(distance, np.sum((candidates - point) ** 2, axis=1), out=distance)
+
+    picked = np.empty(n, dtype=np.intp)
+    for k in range(n):
+        picked[k] = np.argmax(distance)
+        point = candidates[picked[k]]
+        np.minimum(distance, np.sum((candidates - point) ** 2, axis=1), out=distance)
+
+    return picked
+
+
+@lru_cache(maxsize=32)
+def _distinct_rgb(
+    n: int,
+    lightness: tuple[float, float],
+    exclude: tuple[tuple[float, ...], ...],
+    resolution: int,
+    cache: bool,
+) -> NDArray[np.float64]:
+    # Farthest-point sampling is greedy, so the first k of n colors are the same
+    # as the k colors picked on their own. The cache only needs the longest run.
+    key = hashlib.sha1(repr((lightness, exclude, resolution)).encode()).hexdigest()
+    directory = cache_dir() if cache else None
+    filepath = directory / f"distinct_colors_{key[:16]}.npy" if directory else None
+
+    if filepath is not None and filepath.exists():
+        # a file that cannot be read (e.g. a partial or corrupt one) is a miss
+        try:
+            colors = np.load(filepath)
+        except (OSError, ValueError):
+            colors = np.zeros((0, 3))
+        if colors.ndim == 2 and colors.shape[1] == 3 and len(colors) >= n:
+            colors = colors[:n]
+            colors.flags.writeable = False
+            return colors
+
+    grid = np.linspace(0.0, 1.0, resolution)
+    rgb = np.stack(np.meshgrid(grid, grid, grid, indexing="ij"), axis=-1).reshape(-1, 3)
+    lab = _srgb_to_oklab(rgb)
+    keep = (lightness[0] <= lab[:, 0]) & (lab[:, 0] <= lightness[1])
+
+    excluded = _srgb_to_oklab(np.array(exclude)[:, :3]) if exclude else np.zeros((0, 3))
+    colors = rgb[keep][_farthest_points(lab[keep], n, excluded)]
+
+    if filepath is not None:
+        try:
+            with tempfile.NamedTemporaryFile(dir=filepath.parent, delete=False) as f:
+                np.save(f, colors)
+            os.replace(f.name, filepath)
+        except OSError:
+            pass
+
+    colors.flags.writeable = False
+    return colors
+
+
+def distinct_colors(
+    n: int,
+    lightness: tuple[float, float] = (0.45, 0.85),
+    exclude: tuple[ColorType, ...] = ("#ffffff",),
+    resolution: int = 32,
+    cache: bool = True,
+) -> Palette:
+    """Generate ``n`` maximally distinguishable colors.
+
+    Colors are picked from a grid over the sRGB cube by greedy farthest-point
+    sampling in the perceptually uniform OKLab space, so that each color is as
+    different as possible from all of the previously picked (and excluded)
+    colors. Results are memoized to disk (see ``JETPLOT_CACHE_DIR``), so large
+    palettes are only computed once across processes.
+
+    Args:
+      n: Number of colors.
+      lightness: Range of OKLab lightness to pick colors from (Default: (0.45, 0.85)).
+      exclude: Colors to stay away from, e.g. the background (Default: white).
+      resolution: Number of candidate values for each RGB channel (Default: 32).
+      cache: Whether to memoize results to disk (Default: True).
+
+    Returns:
+      palette: A Palette with ``n`` colors.
+    """
+    excluded = tuple(to_rgba(c) for c in exclude)
+    return Palette.from_rgba(_distinct_rgb(n, lightness, excluded, resolution, cache))
 
 
 black = "#000000"
@@ -5,7 +5,6 @@ from functools import partial
 from typing import Any, cast
 
 import numpy as np
-from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
 from matplotlib.image import AxesImage
 from matplotlib.ticker import FixedLocator
@@ -74,7 +73,7 @@ def img(
 
     # colorbar
     if cbar:
-        plt.colorbar(im)
+        kwargs["fig"].colorbar(im, ax=kwargs["ax"])
 
     # clear ticks
     noticks(ax=kwargs["ax"])
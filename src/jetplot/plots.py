@@ -378,7 +378,8 @@ def ellipse(
     -------
     matplotlib.patches.Ellipse
     """
-    ax = cast(Axes, kwargs.get("ax"))
+    ax = cast(Axes, kwargs.pop("ax"))
+    kwargs.pop("fig")
 
     if x.size != y.size:
         raise ValueError("x and y must be the same size")
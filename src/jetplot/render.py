@@ -0,0 +1,530 @@
+"""Batch rendering of figures across a pool of processes.
+
+Example:
+  >>> from jetplot import plots
+  >>> from jetplot.render import render_batch
+  >>> from jetplot.style import light_style
+  >>> jobs = [(plots.hist, (data,), f"hist_{k}.png") for k, data in enumerate(batch)]
+  >>> results = render_batch(jobs, style=light_style())
+  >>> failed = [r for r in results if not r.ok]
+
+Each worker process uses the Agg backend, applies the style once when it starts,
+and draws on figures from a :class:`~jetplot.chart_utils.FigurePool`. Large
+NumPy arrays in the job arguments are placed in shared memory, so they are
+copied once instead of being pickled for every job that uses them.
+
+Figures can also be rendered to bytes from asyncio code, without blocking the
+event loop, with :func:`render_async` or an :class:`AsyncRenderer`:
+
+  >>> png = await render_async(plots.hist, data, fmt="png")
+"""
+
+import asyncio
+import hashlib
+import os
+import pickle
+import threading
+import time
+import traceback
+import types
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .chart_utils import FigurePool
+from .style import Style
+
+__all__ = [
+    "AsyncRenderer",
+    "RenderJob",
+    "RenderResult",
+    "render_async",
+    "render_batch",
+]
+
+
+@dataclass
+class RenderJob:
+    """A plotting function call to render and save.
+
+    Attributes:
+      func: Plotting function that accepts a ``fig`` keyword argument, e.g. a
+        jetplot plotting function. It must be importable by the workers.
+      args: Positional arguments for ``func``.
+      path: File to save the figure to (the format is inferred from it).
+      kwargs: Keyword arguments for ``func``.
+      figsize: Figure size (Default: rcParams["figure.figsize"] in the worker).
+    """
+
+    func: Callable[..., Any]
+    args: Sequence[Any]
+    path: str | Path
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    figsize: tuple[float, float] | None = None
+
+
+@dataclass
+class RenderResult:
+    """Timings (in seconds) and error of a rendered :class:`RenderJob`."""
+
+    path: str
+    plot_time: float = 0.0
+    save_time: float = 0.0
+    pid: int | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def elapsed(self) -> float:
+        return self.plot_time + self.save_time
+
+
+@dataclass(frozen=True)
+class _SharedArray:
+    """Reference to an array in a shared memory block."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+class _SharedArrays:
+    """Moves large arrays into shared memory (once per array object)."""
+
+    def __init__(self, min_bytes: int) -> None:
+        self.min_bytes = min_bytes
+        self.blocks: list[SharedMemory] = []
+        self._refs: dict[int, _SharedArray] = {}
+
+    def share(self, value: Any) -> Any:
+        if isinstance(value, np.ndarray):
+            if value.nbytes < self.min_bytes or value.dtype.hasobject:
+                return value
+            if id(value) not in self._refs:
+                block = SharedMemory(create=True, size=value.nbytes)
+                self.blocks.append(block)
+                np.ndarray(value.shape, value.dtype, buffer=block.buf)[...] = value
+                self._refs[id(value)] = _SharedArray(
+                    block.name, value.shape, value.dtype.str
+                )
+            return self._refs[id(value)]
+        if isinstance(value, list | tuple):
+            return type(value)(self.share(v) for v in value)
+        if isinstance(value, dict):
+            return {k: self.share(v) for k, v in value.items()}
+        return value
+
+    def close(self) -> None:
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+        self._refs.clear()
+
+
+# per-process state of the render workers
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(style: Style | None) -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    if style is not None:
+        style.apply()
+
+    _worker["pool"] = FigurePool()
+
+
+def _attach(value: Any, blocks: list[SharedMemory]) -> Any:
+    """Replaces shared array references with (read-only) arrays."""
+    if isinstance(value, _SharedArray):
+        block = SharedMemory(name=value.name)
+        blocks.append(block)
+        array = np.ndarray(value.shape, np.dtype(value.dtype), buffer=block.buf)
+        array.flags.writeable = False
+        return array
+    if isinstance(value, list | tuple):
+        return type(value)(_attach(v, blocks) for v in value)
+    if isinstance(value, dict):
+        return {k: _attach(v, blocks) for k, v in value.items()}
+    return value
+
+
+def _render(job: RenderJob) -> RenderResult:
+    result = RenderResult(str(job.path), pid=os.getpid())
+    blocks: list[SharedMemory] = []
+    fig = args = kwargs = None
+    try:
+        args = _attach(job.args, blocks)
+        kwargs = _attach(job.kwargs, blocks)
+
+        start = time.perf_counter()
+        fig = _worker["pool"].acquire(job.figsize)
+        job.func(*args, fig=fig, **kwargs)
+        result.plot_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fig.savefig(job.path)
+        result.save_time = time.perf_counter() - start
+
+    except Exception:  # noqa: BLE001
+        result.error = traceback.format_exc()
+
+    finally:
+        if fig is not None:
+            _worker["pool"].release(fig)
+        # drop the arrays before closing the memory they point to
+        del args, kwargs
+        for block in blocks:
+            block.close()
+
+    return result
+
+
+def render_batch(
+    jobs: Iterable[RenderJob | tuple[Any, ...]],
+    style: Style | None = None,
+    max_workers: int | None = None,
+    shared_min_bytes: int = 2**16,
+    mp_context: str | None = None,
+) -> list[RenderResult]:
+    """Renders figures in parallel across a pool of processes.
+
+    Args:
+      jobs: Jobs to render, as :class:`RenderJob` objects or as tuples of
+        ``(func, args, path)`` or ``(func, args, path, kwargs)``.
+      style: A :class:`~jetplot.style.Style` applied once in each worker
+        (Default: None, which keeps matplotlib's defaults).
+      max_workers: Number of worker processes (Default: the number of CPUs).
+      shared_min_bytes: NumPy arrays of at least this size are passed to the
+        workers through shared memory (Default: 64 KiB).
+      mp_context: The multiprocessing start method, e.g. "spawn" or
+        "forkserver" (Default: None, the platform default).
+
+    Returns:
+      results: A :class:`RenderResult` for each job, in order. Failed jobs
+        have ``ok == False`` and the worker's traceback in ``error``.
+    """
+    jobs = [job if isinstance(job, RenderJob) else RenderJob(*job) for job in jobs]
+
+    shared = _SharedArrays(shared_min_bytes)
+    try:
+        tasks = [
+            RenderJob(
+                job.func,
+                shared.share(tuple(job.args)),
+                job.path,
+                shared.share(job.kwargs),
+                job.figsize,
+            )
+            for job in jobs
+        ]
+
+        context = get_context(mp_context) if mp_context else None
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(style,),
+        ) as executor:
+            futures = [executor.submit(_render, task) for task in tasks]
+
+            results = []
+            for job, future in zip(jobs, futures, strict=True):
+                # jobs that cannot be sent to a worker (e.g. local functions
+                # or arguments that cannot be pickled) fail on their own
+                try:
+                    results.append(future.result())
+                except Exception as exc:  # noqa: BLE001
+                    results.append(RenderResult(str(job.path), error=repr(exc)))
+
+    finally:
+        shared.close()
+
+    return results
+
+
+def _cell_contents(cell: types.CellType) -> Any:
+    try:
+        return cell.cell_contents
+    except ValueError:  # an empty cell
+        return _EMPTY_CELL
+
+
+_EMPTY_CELL = "<empty cell>"
+
+
+def _digest(value: Any, h: Any, seen: set[int] | None = None) -> None:
+    """Adds a value (which may contain NumPy arrays and functions) to a hash.
+
+    Functions are hashed by their name and code (with its constants and the
+    global names it uses), along with their default arguments and the contents
+    of their closure, and bound methods also by the object they are bound to.
+    Other objects are pickled, so values that cannot be pickled raise an error.
+    """
+    seen = set() if seen is None else seen
+
+    if isinstance(value, np.ndarray):
+        h.update(f"ndarray{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).data)
+    elif isinstance(value, list | tuple):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for v in value:
+            _digest(v, h, seen)
+    elif isinstance(value, dict):
+        h.update(f"dict{len(value)}".encode())
+        for k, v in sorted(value.items(), key=lambda item: repr(item[0])):
+            _digest(k, h, seen)
+            _digest(v, h, seen)
+    elif isinstance(value, str | bytes | int | float | bool | complex | None):
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+    elif isinstance(value, types.FunctionType):
+        h.update(f"function{value.__module__}.{value.__qualname__}".encode())
+        _digest(value.__code__, h, seen)
+        # functions may refer to themselves, e.g. through a closure
+        if id(value) not in seen:
+            seen.add(id(value))
+            cells = [_cell_contents(c) for c in value.__closure__ or ()]
+            _digest((value.__defaults__, value.__kwdefaults__, cells), h, seen)
+    elif isinstance(value, types.CodeType):
+        h.update(f"code{value.co_filename}:{value.co_firstlineno}".encode())
+        h.update(value.co_code)
+        # constants include the code of nested functions and comprehensions
+        _digest((value.co_names, value.co_consts), h, seen)
+    elif isinstance(value, types.MethodType | types.BuiltinMethodType):
+        h.update(f"method{value.__qualname__}".encode())
+        if not isinstance(value.__self__, types.ModuleType | None):
+            _digest(value.__self__, h, seen)
+        _digest(getattr(value, "__func__", None), h, seen)
+    elif isinstance(value, partial):
+        h.update(b"partial")
+        _digest((value.func, value.args, value.keywords), h, seen)
+    elif isinstance(value, type):
+        h.update(f"type{value.__module__}.{value.__qualname__}".encode())
+    else:
+        h.update(pickle.dumps(value))
+
+
+# styles set the global rcParams, so threads that render with one take turns
+_styled_render = threading.Lock()
+
+
+def _render_bytes(
+    pool: FigurePool | None,
+    style: Style | None,
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    fmt: str,
+    figsize: Sequence[float] | None,
+    dpi: float | None,
+) -> bytes:
+    # worker processes have their own pool, and already use the style
+    pool = _worker["pool"] if pool is None else pool
+    if style is None:
+        return pool.render(func, *args, fmt=fmt, figsize=figsize, dpi=dpi, **kwargs)
+    with _styled_render, style:
+        return pool.render(func, *args, fmt=fmt, figsize=figsize, dpi=dpi, **kwargs)
+
+
+def _retrieve_exception(task: asyncio.Task[bytes]) -> None:
+    # avoids "exception was never retrieved" warnings when every caller of a
+    # failed render was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncRenderer:
+    """Renders figures to bytes for asyncio code, with caching and backpressure.
+
+    Figures are built and saved in a bounded executor, so the event loop is
+    never blocked. Renders are limited to ``max_pending`` at a time; further
+    calls wait for a free slot before they are submitted. Results are cached
+    (in an LRU cache of ``cache_size`` images) by a hash of the function and
+    its arguments, and concurrent identical requests share a single render.
+    Requests whose inputs cannot be hashed (e.g. arguments that cannot be
+    pickled) are rendered without caching.
+
+    In the default thread mode, a style is applied with a
+    :class:`~jetplot.style.Style` context around each render, which serializes
+    renders that use it. With ``processes=True``, renders run in worker
+    processes that apply the style once, so they run in parallel, but the
+    arguments are pickled for every request.
+
+    Args:
+      max_workers: Number of threads or processes (Default: 4).
+      max_pending: Maximum number of renders submitted at once (Default: 64).
+      cache_size: Maximum number of cached images, 0 to disable (Default: 128).
+      style: Style to render with (Default: None, the current rcParams).
+      processes: Render in a process pool instead of threads (Default: False).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        cache_size: int = 128,
+        style: Style | None = None,
+        processes: bool = False,
+    ) -> None:
+        self.max_pending = max_pending
+        self.cache_size = cache_size
+        self.style = style
+        self.hits = 0
+        self.misses = 0
+
+        self._executor: Executor
+        if processes:
+            self._executor = ProcessPoolExecutor(
+                max_workers, initializer=_init_worker, initargs=(style,)
+            )
+            self._pool = None
+        else:
+            self._executor = ThreadPoolExecutor(max_workers, "jetplot-render")
+            self._pool = FigurePool(maxsize=max_workers)
+
+        self._cache: OrderedDict[bytes, bytes] = OrderedDict()
+        self._inflight: dict[bytes, asyncio.Task[bytes]] = {}
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def _key(self, func: Callable[..., Any], *parts: Any) -> bytes | None:
+        """Hash of a request, or None if its inputs cannot be hashed."""
+        h = hashlib.blake2b(digest_size=20)
+        try:
+            _digest((func, *parts), h)
+            if self.style is not None:
+                _digest(dict(self.style.params), h)
+        except Exception:  # noqa: BLE001 (pickling raises many types of errors)
+            return None
+        return h.digest()
+
+    async def render(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        fmt: str = "png",
+        figsize: Sequence[float] | None = None,
+        dpi: float | None = None,
+        **kwargs: Any,
+    ) -> bytes:
+        """Renders a plotting function (that accepts ``fig=``) and returns the image."""
+        key = self._key(func, args, kwargs, fmt, figsize, dpi)
+        if key is None:
+            self.misses += 1
+            return await self._run(func, args, kwargs, fmt, figsize, dpi)
+
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        # the render runs in a task owned by the renderer, which every caller
+        # awaits through a shield, so a cancelled caller does not cancel it
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.get_running_loop().create_task(
+                self._render_and_cache(key, func, args, kwargs, fmt, figsize, dpi)
+            )
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        else:
+            self.hits += 1
+
+        return await asyncio.shield(task)
+
+    async def _render_and_cache(
+        self,
+        key: bytes,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        fmt: str,
+        figsize: Sequence[float] | None,
+        dpi: float | None,
+    ) -> bytes:
+        try:
+            data = await self._run(func, args, kwargs, fmt, figsize, dpi)
+        finally:
+            del self._inflight[key]
+
+        if self.cache_size > 0:
+            self._cache[key] = data
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return data
+
+    async def _run(
+        self,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        fmt: str,
+        figsize: Sequence[float] | None,
+        dpi: float | None,
+    ) -> bytes:
+        """Renders in the executor, once a slot is free."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.setdefault(
+            loop, asyncio.Semaphore(self.max_pending)
+        )
+        async with semaphore:
+            return await loop.run_in_executor(
+                self._executor,
+                _render_bytes,
+                self._pool,
+                None if self._pool is None else self.style,
+                func,
+                args,
+                kwargs,
+                fmt,
+                figsize,
+                dpi,
+            )
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def close(self) -> None:
+        """Shuts down the executor, waiting for running renders to finish."""
+        self._executor.shutdown()
+
+
+_default_renderer: AsyncRenderer | None = None
+
+
+async def render_async(
+    func: Callable[..., Any], *args: Any, fmt: str = "png", **kwargs: Any
+) -> bytes:
+    """Renders a figure without blocking the event loop, using a shared
+    :class:`AsyncRenderer` (with the default settings).
+
+    Args:
+      func: Plotting function that accepts a ``fig`` keyword argument.
+      *args: Positional arguments for ``func``.
+      fmt: Image format (Default: "png").
+      **kwargs: Keyword arguments for ``func`` (or ``figsize`` and ``dpi``).
+
+    Returns:
+      data: The encoded image.
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = AsyncRenderer()
+    return await _default_renderer.render(func, *args, fmt=fmt, **kwargs)
@@ -2,13 +2,26 @@
 
 from __future__ import annotations
 
-from typing import Any, Protocol, SupportsIndex
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal, Protocol, SupportsIndex
 
 import numpy as np
 from numpy.typing import ArrayLike, NDArray
+from scipy.linalg import solve_triangular
 from scipy.ndimage import gaussian_filter1d
 
-__all__ = ["smooth", "canoncorr", "participation_ratio", "stable_rank", "normalize"]
+__all__ = [
+    "smooth",
+    "canoncorr",
+    "canoncorr_batch",
+    "Subspace",
+    "participation_ratio",
+    "participation_ratio_from_data",
+    "CovarianceAccumulator",
+    "stable_rank",
+    "normalize",
+]
 
 FloatArray = NDArray[np.floating]
 
@@ -50,11 +63,195 @@ def participation_ratio(C: np.ndarray) -> float:
     return diag_sum**2 / diag_sq_sum
 
 
-def canoncorr(X: FloatArray, Y: FloatArray) -> FloatArray:
+class CovarianceAccumulator:
+    """Streaming (and mergeable) accumulator for the covariance of a dataset.
+
+    Rows of the data are observations and columns are features. Chunks of rows
+    are folded in with :meth:`update`, and partial statistics computed on
+    different workers can be combined with :meth:`merge` [1]_.
+
+    References:
+      .. [1] Chan, Tony F., Gene H. Golub, and Randall J. LeVeque. "Updating
+       formulae and a pairwise algorithm for computing sample variances."
+       COMPSTAT 1982.
+    """
+
+    def __init__(self, n_features: int, dtype: Any = np.float64) -> None:
+        self.count = 0
+        self.mean = np.zeros(n_features, dtype=dtype)
+        self.scatter = np.zeros((n_features, n_features), dtype=dtype)
+
+    def update(self, X: ArrayLike) -> CovarianceAccumulator:
+        """Adds a chunk of observations (rows of X) to the accumulator."""
+        X = np.asarray(X, dtype=self.mean.dtype)
+        if X.ndim != 2 or X.shape[1] != self.mean.size:
+            raise ValueError(f"X must be a matrix with {self.mean.size} columns")
+
+        if X.shape[0] == 0:
+            return self
+
+        mean = X.mean(axis=0)
+        Xc = X - mean
+        return self._combine(X.shape[0], mean, Xc.T @ Xc)
+
+    def merge(self, other: CovarianceAccumulator) -> CovarianceAccumulator:
+        """Merges the statistics of another accumulator into this one."""
+        if other.mean.shape != self.mean.shape:
+            raise ValueError("Accumulators must have the same number of features")
+
+        if other.count == 0:
+            return self
+
+        return self._combine(other.count, other.mean, other.scatter)
+
+    def _combine(
+        self, count: int, mean: NDArray[np.floating], scatter: NDArray[np.floating]
+    ) -> CovarianceAccumulator:
+        total = self.count + count
+        delta = mean - self.mean
+        self.scatter += scatter + np.outer(delta, delta) * (self.count * count / total)
+        self.mean += delta * (count / total)
+        self.count = total
+        return self
+
+    @property
+    def covariance(self) -> NDArray[np.floating]:
+        """Sample covariance of the observations seen so far."""
+        if self.count < 2:
+            raise ValueError("At least two observations are required")
+        return self.scatter / (self.count - 1)
+
+    def participation_ratio(self) -> float:
+        """Participation ratio of the accumulated covariance."""
+        return participation_ratio(self.scatter)
+
+
+def participation_ratio_from_data(
+    X: ArrayLike, chunk_size: int | None = None, center: bool = True
+) -> float:
+    """Compute the participation ratio of the covariance of a dataset.
+
+    This avoids forming the (features x features) covariance matrix whenever
+    there are fewer samples than features, by using the eigenvalues of the
+    smaller (samples x samples) Gram matrix instead. If ``chunk_size`` is given,
+    the covariance is accumulated over chunks of rows, so that ``X`` can be a
+    memory-mapped array that does not fit in memory.
+
+    Args:
+      X: Data matrix, with observations in rows and features in columns.
+      chunk_size: Number of rows to process at a time (Default: None, all rows).
+      center: Whether to subtract the mean from each feature (Default: True).
+
+    Returns:
+      pr: The participation ratio, ``trace(C) ** 2 / trace(C @ C)``.
+    """
+    if chunk_size is not None:
+        if not center:
+            raise ValueError("Chunked computation requires center=True")
+
+        n_samples, n_features = np.shape(X)
+        acc = CovarianceAccumulator(n_features)
+        for start in range(0, n_samples, chunk_size):
+            acc.update(X[start : start + chunk_size])  # pyrefly: ignore
+        return acc.participation_ratio()
+
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim != 2:
+        raise ValueError("X must be a matrix")
+
+    if center:
+        X = X - X.mean(axis=0)
+
+    # The nonzero eigenvalues of X^T X and X X^T are the same.
+    G = X @ X.T if X.shape[0] < X.shape[1] else X.T @ X
+    return participation_ratio(G)
+
+
+class Subspace:
+    """Orthonormal basis for the column space of a matrix.
+
+    Computing the basis (via the QR decomposition) is the expensive part of
+    :func:`canoncorr`, so a subspace that is compared against many others
+    should be wrapped in this class once and reused.
+    """
+
+    def __init__(self, X: ArrayLike) -> None:
+        # pyrefly: ignore  # no-matching-overload, bad-argument-type
+        self.basis, _ = np.linalg.qr(np.asarray(X), mode="reduced")
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.basis.shape
+
+
+def _orthonormalize(X: FloatArray | Subspace) -> FloatArray:
+    return X.basis if isinstance(X, Subspace) else Subspace(X).basis
+
+
+def _whitened_chunks(
+    X: ArrayLike, R: FloatArray | None, chunk_size: int
+) -> Iterator[FloatArray]:
+    """Yields chunks of rows of ``X @ inv(R)`` without forming the full product."""
+    for start in range(0, np.shape(X)[0], chunk_size):
+        chunk = np.asarray(X[start : start + chunk_size], dtype=np.float64)  # pyrefly: ignore
+        if R is None:
+            yield chunk
+        else:
+            yield solve_triangular(R, chunk.T, trans="T").T
+
+
+def _cholqr_factor(X: ArrayLike, chunk_size: int, max_passes: int = 3) -> FloatArray:
+    """Triangular factor R of ``X = Q R`` via (shifted) Cholesky-QR.
+
+    Only the small (k x k) Gram matrices are accumulated in memory. If the
+    factor is ill-conditioned, the implicit Q is re-orthogonalized with an
+    additional pass over the data (CholeskyQR2) [1]_.
+
+    References:
+      .. [1] Fukaya, Takeshi, et al. "Shifted Cholesky QR for computing the QR
+       factorization of ill-conditioned matrices." SIAM Journal on Scientific
+       Computing 42.1 (2020): A477-A503.
+    """
+    n, k = np.shape(X)
+    eps = np.finfo(np.float64).eps
+    R = None
+
+    for _ in range(max_passes):
+        G = np.zeros((k, k))
+        for chunk in _whitened_chunks(X, R, chunk_size):
+            G += chunk.T @ chunk
+
+        try:
+            step = np.linalg.cholesky(G).T
+        except np.linalg.LinAlgError:
+            # Shift the Gram matrix to guarantee it is numerically positive definite.
+            shift = 11 * (n * k + k * (k + 1)) * eps * np.trace(G)
+            step = np.linalg.cholesky(G + shift * np.eye(k)).T
+
+        R = step if R is None else step @ R
+        if np.linalg.cond(step) < eps**-0.25:
+            break
+
+    return R  # pyrefly: ignore
+
+
+def canoncorr(
+    X: FloatArray | Subspace,
+    Y: FloatArray | Subspace,
+    method: Literal["qr", "cholqr"] = "qr",
+    chunk_size: int | None = None,
+) -> FloatArray:
     """Canonical correlation between two subspaces.
 
     Args:
-      X, Y: The subspaces to compare. They should be of the same size.
+      X, Y: The subspaces to compare. They should be of the same size. Either
+        can be a precomputed :class:`Subspace`.
+      method: Either "qr" (Default), which computes reduced QR decompositions, or
+        "cholqr", which computes the principal angles from the small Gram matrices
+        of X and Y without materializing the orthonormal bases. The latter is much
+        cheaper for tall (e.g. memory-mapped) inputs.
+      chunk_size: Number of rows processed at a time when ``method="cholqr"``
+        (Default: None, all rows at once).
 
     Returns:
       corr: array_like, Cosine of the principal angles.
@@ -71,16 +268,88 @@ def canoncorr(X: FloatArray, Y: FloatArray) -> FloatArray:
       .. [2] Björck, Ȧke, and Gene H. Golub. "Numerical methods for computing angles
        between linear subspaces." Mathematics of computation 27.123 (1973): 579-594.
     """
+    if method == "cholqr":
+        X = X.basis if isinstance(X, Subspace) else X
+        Y = Y.basis if isinstance(Y, Subspace) else Y
+        if np.shape(X)[0] != np.shape(Y)[0]:
+            raise ValueError("X and Y must have the same number of rows")
+
+        chunk_size = np.shape(X)[0] if chunk_size is None else chunk_size
+        Rx = _cholqr_factor(X, chunk_size)
+        Ry = _cholqr_factor(Y, chunk_size)
+
+        # inner product between the (implicitly) orthogonalized spaces
+        M = np.zeros((Rx.shape[0], Ry.shape[0]))
+        chunks = zip(
+            _whitened_chunks(X, Rx, chunk_size),
+            _whitened_chunks(Y, Ry, chunk_size),
+            strict=True,
+        )
+        for qx, qy in chunks:
+            M += qx.T @ qy
+        return np.linalg.svd(M, compute_uv=False)
+
+    elif method != "qr":
+        raise ValueError("method must be 'qr' or 'cholqr'")
+
     # Orthogonalize each subspace
-    # pyrefly: ignore  # no-matching-overload, bad-argument-type
-    Qx, _ = np.linalg.qr(X, mode="reduced")
-    # pyrefly: ignore  # no-matching-overload, bad-argument-type
-    Qy, _ = np.linalg.qr(Y, mode="reduced")
+    Qx = _orthonormalize(X)
+    Qy = _orthonormalize(Y)
 
     # singular values of the inner product between the orthogonalized spaces
     return np.linalg.svd(Qx.T @ Qy, compute_uv=False)
 
 
+def canoncorr_batch(
+    Xs: Sequence[FloatArray | Subspace],
+    Ys: Sequence[FloatArray | Subspace] | None = None,
+    max_workers: int = 1,
+) -> FloatArray:
+    """Canonical correlations between every pair of subspaces in two collections.
+
+    Each subspace is orthonormalized exactly once (arrays that appear multiple
+    times, by identity, share a single QR decomposition), and the principal
+    angles against every subspace in ``Ys`` are computed with a single batched
+    SVD per subspace in ``Xs``.
+
+    Args:
+      Xs: Sequence of subspaces (arrays or :class:`Subspace`), all the same shape.
+      Ys: Sequence of subspaces to compare against (Default: None, uses ``Xs``).
+      max_workers: Number of threads used to process ``Xs`` (Default: 1).
+
+    Returns:
+      corr: Array with shape ``(len(Xs), len(Ys), k)`` containing the cosines of
+        the principal angles between ``Xs[i]`` and ``Ys[j]``.
+    """
+    cache: dict[int, FloatArray] = {}
+
+    def stack(subspaces: Sequence[FloatArray | Subspace]) -> FloatArray:
+        bases = []
+        for X in subspaces:
+            if id(X) not in cache:
+                cache[id(X)] = _orthonormalize(X)
+            bases.append(cache[id(X)])
+
+        if len({Q.shape for Q in bases}) > 1:
+            raise ValueError("All subspaces in a collection must have the same shape")
+        return np.stack(bases)
+
+    Qxs = stack(Xs)
+    Qys = Qxs if Ys is None else stack(Ys)
+
+    if Qxs.shape[1] != Qys.shape[1]:
+        raise ValueError("Subspaces must live in the same ambient dimension")
+
+    def compare(Qx: FloatArray) -> FloatArray:
+        return np.linalg.svd(Qx.T @ Qys, compute_uv=False)
+
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return np.stack(list(pool.map(compare, Qxs)))
+
+    return np.stack([compare(Qx) for Qx in Qxs])
+
+
 class NormFunction(Protocol):
     def __call__(
         self, x: ArrayLike, *, axis: SupportsIndex, keepdims: bool
@@ -88,16 +357,62 @@ class NormFunction(Protocol):
 
 
 def normalize(
-    X: ArrayLike, axis: int = -1, norm: NormFunction = np.linalg.norm
+    X: ArrayLike,
+    axis: int = -1,
+    norm: NormFunction = np.linalg.norm,
+    out: NDArray[np.floating] | None = None,
+    inplace: bool = False,
+    chunk_size: int | None = None,
 ) -> NDArray[np.floating]:
     """Normalizes elements of an array or matrix.
 
+    Floating point inputs keep their dtype (other inputs are cast to float64),
+    and elements with a norm of zero are left as zeros.
+
     Args:
         X: The set of arrays to normalize.
         axis: The axis along which to compute the norm (Default: -1).
         norm: Function that computes the norm (Default: np.linalg.norm).
+        out: Optional array to store the result in (Default: None).
+        inplace: If True, normalizes X in place, equivalent to ``out=X``
+          (Default: False).
+        chunk_size: If given, processes the array in chunks of this size along
+          a non-normalized axis, bounding the size of temporary arrays
+          (Default: None).
 
     Returns:
         Xn: Arrays that have been normalized using to the given function.
     """
-    return np.asarray(X) / norm(X, axis=axis, keepdims=True)
+    X = np.asarray(X)
+
+    if inplace:
+        if out is not None:
+            raise ValueError("Cannot specify both out and inplace=True")
+        if not np.issubdtype(X.dtype, np.floating):
+            raise TypeError("In-place normalization requires a floating point array")
+        out = X
+
+    if out is None:
+        dtype = X.dtype if np.issubdtype(X.dtype, np.floating) else np.float64
+        out = np.empty(X.shape, dtype=dtype)
+    elif out.shape != X.shape:
+        raise ValueError(f"out must have shape {X.shape}, got {out.shape}")
+
+    def _normalize(x: NDArray[Any], o: NDArray[np.floating]) -> None:
+        n = norm(x, axis=axis, keepdims=True)
+        np.divide(x, np.where(n > 0, n, 1), out=o, casting="unsafe")
+
+    axis = axis % X.ndim if X.ndim else 0
+    other_axes = [ax for ax in range(X.ndim) if ax != axis]
+
+    if chunk_size is None or not other_axes:
+        _normalize(X, out)
+        return out
+
+    # split along the first axis that is not being normalized
+    index: list[Any] = [slice(None)] * X.ndim
+    for start in range(0, X.shape[other_axes[0]], chunk_size):
+        index[other_axes[0]] = slice(start, start + chunk_size)
+        _normalize(X[tuple(index)], out[tuple(index)])
+
+    return out
@@ -1,25 +1,48 @@
 """Opinionated matplotlib style defaults."""
 
-from collections.abc import Mapping
-from functools import partial
-from typing import Any
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from functools import cache, partial, wraps
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
 from cycler import cycler
+from matplotlib import RcParams, ft2font, rcParams
 from matplotlib import font_manager as fm
-from matplotlib import rcParams
 from matplotlib.typing import ColorType
 
 from . import colors as c
+from ._cache import cache_dir
+
+if TYPE_CHECKING:
+    from typing import Self
 
 __all__ = [
     "STYLE_DEFAULTS",
     "set_defaults",
     "light_mode",
     "dark_mode",
+    "FAST_DEFAULTS",
+    "fast_mode",
+    "fast_style",
+    "Style",
+    "make_style",
+    "light_style",
+    "dark_style",
     "set_font",
     "set_dpi",
     "available_fonts",
     "install_fonts",
+    "FontReport",
 ]
 
 
@@ -76,30 +99,61 @@ STYLE_DEFAULTS = {
 }
 
 
+def _color_params(bg: ColorType, fg: ColorType, text: ColorType) -> dict[str, Any]:
+    return {
+        "figure.facecolor": bg,
+        "figure.edgecolor": bg,
+        "axes.facecolor": bg,
+        "savefig.facecolor": bg,
+        "savefig.edgecolor": bg,
+        "axes.edgecolor": fg,
+        "axes.labelcolor": text,
+        "xtick.color": fg,
+        "ytick.color": fg,
+        "legend.edgecolor": fg,
+        "grid.color": fg,
+        "text.color": text,
+    }
+
+
+def _default_params(
+    bg: ColorType,
+    fg: ColorType,
+    text: ColorType,
+    cycler_colors: c.Palette,
+    defaults: Mapping[str, Any],
+    font: str,
+) -> dict[str, Any]:
+    """Builds the rcParams set by :func:`set_defaults`."""
+    params = {**defaults, **_color_params(bg, fg, text)}
+    params["axes.prop_cycle"] = cycler(color=cycler_colors)
+    if font in _font_index():
+        params["font.family"] = font
+    return params
+
+
+# cheaper rendering for previews and thumbnails, applied on top of a style
+FAST_DEFAULTS = {
+    "figure.dpi": 72,
+    "savefig.dpi": "figure",
+    "savefig.bbox": None,
+    "path.simplify": True,
+    "path.simplify_threshold": 1.0,
+    "agg.path.chunksize": 10000,
+    "lines.antialiased": False,
+    "patch.antialiased": False,
+}
+
+
 def set_colors(bg: ColorType, fg: ColorType, text: ColorType) -> None:
     """Set background/foreground colorscheme."""
-    rcParams.update(
-        {
-            "figure.facecolor": bg,
-            "figure.edgecolor": bg,
-            "axes.facecolor": bg,
-            "savefig.facecolor": bg,
-            "savefig.edgecolor": bg,
-            "axes.edgecolor": fg,
-            "axes.labelcolor": text,
-            "xtick.color": fg,
-            "ytick.color": fg,
-            "legend.edgecolor": fg,
-            "grid.color": fg,
-            "text.color": text,
-        }
-    )
+    rcParams.update(_color_params(bg, fg, text))
 
 
 def set_font(fontname: str) -> None:
     """Specifies the matplotlib default font."""
 
-    if fontname not in available_fonts():
+    if fontname not in _font_index():
         raise ValueError(f"Font {fontname} not found.")
 
     rcParams["font.family"] = fontname
@@ -120,40 +174,371 @@ def set_defaults(
     font: str = "Helvetica",
 ) -> None:
     """Sets matplotlib defaults."""
-    rcParams.update(defaults)
-    set_colors(bg, fg, text)
-    rcParams["axes.prop_cycle"] = cycler(color=cycler_colors)
+    rcParams.update(_default_params(bg, fg, text, cycler_colors, defaults, font))
 
-    try:
-        set_font(font)
-    except ValueError:
-        pass
 
+@dataclass(eq=False)
+class _StyleContext:
+    params: dict[str, Any]
+    token: Token[tuple["_StyleContext", ...]] | None = None
 
-light_mode = partial(
-    set_defaults, bg=c.white, fg=c.gray[9], text=c.gray[9], cycler_colors=c.dark
-)
-dark_mode = partial(
-    set_defaults, bg=c.black, fg=c.zinc[3], text=c.zinc[0], cycler_colors=c.bright
+
+# the style contexts entered in the current thread or task, innermost last
+_style_stack: ContextVar[tuple[_StyleContext, ...]] = ContextVar(
+    "jetplot_style_stack", default=()
 )
 
+# the style contexts active in any thread or task (in the order they were
+# entered), and the rcParams values from before they changed them. The lock
+# only guards this bookkeeping, and is never held while a context is active.
+_style_active: list[_StyleContext] = []
+_style_base: dict[str, Any] = {}
+_style_lock = threading.Lock()
+
+
+class Style:
+    """A precompiled set of rcParams.
+
+    The parameters are validated once, when the style is created, so applying
+    the style is a plain dictionary update. A style can be applied globally with
+    :meth:`apply`, or temporarily as a context manager or decorator:
+
+    >>> with light_style():
+    ...     fig, ax = plt.subplots()
+
+    Matplotlib's rcParams are global, so style contexts are not thread- or
+    async-safe: while contexts are active in several threads or asyncio tasks,
+    the most recently entered one is in effect for all of them. When a context
+    exits, its parameters go back to those of the latest context that is still
+    active, or to their values from before any style context was entered.
+    """
+
+    def __init__(self, params: Mapping[str, Any]) -> None:
+        self._params = dict(RcParams(params))
+
+    @property
+    def params(self) -> Mapping[str, Any]:
+        """The validated rcParams of this style (read-only)."""
+        return MappingProxyType(self._params)
+
+    def apply(self) -> None:
+        """Sets the global rcParams to this style (without revalidating)."""
+        dict.update(rcParams, self._params)
+
+    def __enter__(self) -> "Self":
+        context = _StyleContext(self._params)
+        context.token = _style_stack.set((*_style_stack.get(), context))
+        with _style_lock:
+            for key in self._params:
+                _style_base.setdefault(key, dict.__getitem__(rcParams, key))
+            _style_active.append(context)
+            self.apply()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        context = _style_stack.get()[-1]
+        _style_stack.reset(context.token)  # pyrefly: ignore
+        with _style_lock:
+            _style_active.remove(context)
+            for key in context.params:
+                for other in reversed(_style_active):
+                    if key in other.params:
+                        value = other.params[key]
+                        break
+                else:
+                    value = _style_base.pop(key)
+                dict.__setitem__(rcParams, key, value)
+
+    def __call__(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self:
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def __or__(self, other: "Style | Mapping[str, Any]") -> "Style":
+        """Returns a new style with the parameters of both (``other`` takes precedence)."""
+        params = other._params if isinstance(other, Style) else other
+        return Style({**self._params, **params})
+
+
+def make_style(
+    *,
+    bg: ColorType,
+    fg: ColorType,
+    text: ColorType,
+    cycler_colors: c.Palette,
+    defaults: Mapping[str, Any] = STYLE_DEFAULTS,
+    font: str = "Helvetica",
+) -> Style:
+    """Builds a :class:`Style` with the same parameters as :func:`set_defaults`."""
+    return Style(_default_params(bg, fg, text, cycler_colors, defaults, font))
+
+
+@cache
+def fast_style() -> Style:
+    """The (cached) :class:`Style` with the :data:`FAST_DEFAULTS` preview settings.
+
+    It only overrides resolution and rendering settings, so it can be nested
+    inside (or combined with) another style: ``light_style() | fast_style()``.
+    Figures are built and saved with these settings when both happen inside
+    the style context.
+    """
+    return Style(FAST_DEFAULTS)
+
+
+def fast_mode() -> None:
+    """Sets the matplotlib defaults to the :data:`FAST_DEFAULTS` preview settings."""
+    fast_style().apply()
+
+
+_LIGHT = {"bg": c.white, "fg": c.gray[9], "text": c.gray[9], "cycler_colors": c.dark}
+_DARK = {"bg": c.black, "fg": c.zinc[3], "text": c.zinc[0], "cycler_colors": c.bright}
+
+light_mode = partial(set_defaults, **_LIGHT)
+dark_mode = partial(set_defaults, **_DARK)
+
+
+@cache
+def light_style() -> Style:
+    """The (cached) :class:`Style` set by :func:`light_mode`."""
+    return make_style(**_LIGHT)
+
+
+@cache
+def dark_style() -> Style:
+    """The (cached) :class:`Style` set by :func:`dark_mode`."""
+    return make_style(**_DARK)
+
+
+# maps font names to files, built from (and invalidated when the size of)
+# the font manager's font list changes
+_font_cache: dict[str, Any] = {"key": None, "index": {}, "names": []}
+
+
+def _font_index() -> dict[str, list[str]]:
+    """Returns a (cached) mapping from font names to font files."""
+    ttflist = fm.fontManager.ttflist  # pyrefly: ignore
+    key = (id(fm.fontManager), len(ttflist))
+
+    if _font_cache["key"] != key:
+        index: dict[str, list[str]] = {}
+        for font in ttflist:
+            index.setdefault(font.name, []).append(font.fname)
+        _font_cache.update(key=key, index=index, names=sorted(index))
+
+    return _font_cache["index"]
+
 
 def available_fonts() -> list[str]:
     """Returns a list of available fonts."""
-    return sorted(set([f.name for f in fm.fontManager.ttflist]))  # pyrefly: ignore
+    _font_index()
+    return list(_font_cache["names"])
+
+
+def _load_json(path: Path) -> dict[str, Any]:
+    """Reads a JSON object, or returns an empty one if the file is missing or invalid."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_json(path: Path, data: dict[str, Any]) -> None:
+    """Writes JSON atomically, so concurrent readers never see a partial file.
+
+    The file is only a cache, so errors (e.g. a full disk) are ignored.
+    """
+    try:
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+            json.dump(data, f)
+        os.replace(f.name, path)
+    except OSError:
+        pass
+
+
+def _find_fonts(filepath: str, cache: bool) -> list[str]:
+    """Finds font files in a folder, optionally using a persistent index.
+
+    The index records the modification time of every directory in the folder,
+    so it can be validated without listing the directories again.
+    """
+    directory = cache_dir() if cache else None
+    if directory is None:
+        return fm.findSystemFonts(fontpaths=[filepath])
+
+    root = os.path.abspath(filepath)
+    index_path = directory / "font_dirs.json"
+    index = _load_json(index_path)
+
+    entry = index.get(root)
+    if entry is not None:
+        try:
+            if all(os.stat(d).st_mtime_ns == t for d, t in entry["dirs"].items()):
+                return list(entry["files"])
+        except (OSError, KeyError, TypeError, AttributeError):
+            pass
+
+    dirs = {d: os.stat(d).st_mtime_ns for d, _, _ in os.walk(root)}
+    files = sorted(fm.findSystemFonts(fontpaths=[root]))
+    index[root] = {"dirs": dirs, "files": files}
+    _save_json(index_path, index)
+
+    return files
+
+
+def _parse_font(path: str) -> list[fm.FontEntry]:
+    """Reads the font properties of every face in a font file."""
+    font = ft2font.FT2Font(path)
+    faces = [font] + [
+        ft2font.FT2Font(path, face_index=i) for i in range(1, font.num_faces)
+    ]
+
+    # matplotlib >= 3.10 also registers alternate family names (e.g. "Foo Light")
+    alt_names = getattr(fm, "_get_font_alt_names", lambda *_: [])
+
+    entries = []
+    for face in faces:
+        prop = fm.ttfFontProperty(face)
+        entries.append(prop)
+        for name, weight in alt_names(face, prop.name):
+            entries.append(dataclasses.replace(prop, name=name, weight=weight))
+    return entries
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@dataclass
+class FontReport:
+    """Summary of an :func:`install_fonts` call."""
+
+    files: list[str] = field(default_factory=list)
+    added: list[str] = field(default_factory=list)
+    cached: int = 0
+    parsed: int = 0
+    skipped: int = 0
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        text = (
+            f"{len(self.files)} font files ({self.cached} cached, "
+            f"{self.parsed} parsed, {self.skipped} already installed)"
+        )
+        if self.added:
+            text += f"\nAdded the following fonts: {', '.join(self.added)}"
+        else:
+            text += "\nNo new fonts added."
+        for path, error in self.errors.items():
+            text += f"\nFailed to load {path}: {error}"
+        return text
+
+
+def install_fonts(
+    filepath: str,
+    cache: bool = True,
+    max_workers: int | None = None,
+    verbose: bool = False,
+) -> FontReport:
+    """Installs .ttf fonts in the given folder.
+
+    With ``cache=True``, the folder scan and the parsed properties of each font
+    file are kept in the jetplot cache directory. Files are identified by the
+    hash of their contents (rehashed only when their size or mtime changes), so
+    later calls, e.g. in other processes, only parse new or modified fonts.
+
+    Args:
+      filepath: Folder to search (recursively) for fonts.
+      cache: Use the persistent font registry (Default: True).
+      max_workers: Number of threads used to parse new fonts (Default: None,
+        which uses the ThreadPoolExecutor default).
+      verbose: Print the report (Default: False).
+
+    Returns:
+      report: A :class:`FontReport` listing the files found and fonts added.
+    """
+    report = FontReport(files=_find_fonts(filepath, cache))
+    original_fonts = set(_font_index())
+    installed = {font.fname for font in fm.fontManager.ttflist}  # pyrefly: ignore
+
+    directory = cache_dir() if cache else None
+    registry_path = directory / "fonts.json" if directory else None
+    registry = _load_json(registry_path) if registry_path else {}
+    if not all(isinstance(registry.get(k, {}), dict) for k in ("files", "fonts")):
+        registry = {}
+    stats = registry.setdefault("files", {})
+    fonts = registry.setdefault("fonts", {})
+    changed = False
+
+    entries: dict[str, list[fm.FontEntry]] = {}
+    pending: dict[str, str | None] = {}
+    for path in report.files:
+        if path in installed:
+            report.skipped += 1
+            continue
+
+        digest = None
+        if registry_path is not None:
+            try:
+                st = os.stat(path)
+                known = stats.get(path)
+                if (
+                    isinstance(known, dict)
+                    and known.get("size") == st.st_size
+                    and known.get("mtime") == st.st_mtime_ns
+                    and isinstance(known.get("hash"), str)
+                ):
+                    digest = known["hash"]
+                else:
+                    digest = _file_digest(path)
+                    stats[path] = {
+                        "size": st.st_size,
+                        "mtime": st.st_mtime_ns,
+                        "hash": digest,
+                    }
+                    changed = True
+            except OSError as exc:
+                report.errors[path] = str(exc)
+                continue
+
+        try:
+            entries[path] = [
+                fm.FontEntry(**{**e, "fname": path}) for e in fonts[digest]
+            ]
+            report.cached += 1
+        except (KeyError, TypeError):  # not cached, or an invalid entry
+            pending[path] = digest
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {path: pool.submit(_parse_font, path) for path in pending}
+
+    for path, future in futures.items():
+        try:
+            entries[path] = future.result()
+        except (OSError, RuntimeError, ValueError) as exc:
+            report.errors[path] = str(exc)
+            continue
 
+        report.parsed += 1
+        if (digest := pending[path]) is not None:
+            fonts[digest] = [dataclasses.asdict(e) for e in entries[path]]
+            changed = True
 
-def install_fonts(filepath: str) -> None:
-    """Installs .ttf fonts in the given folder."""
+    # register fonts in the order they were found, as addfont would
+    for path in report.files:
+        fm.fontManager.ttflist.extend(entries.get(path, []))  # pyrefly: ignore
+    fm.fontManager._findfont_cached.cache_clear()  # pyrefly: ignore
 
-    original_fonts = set(available_fonts())
-    font_files = fm.findSystemFonts(fontpaths=[filepath])
+    if registry_path is not None and changed:
+        _save_json(registry_path, registry)
 
-    for font_file in font_files:
-        fm.fontManager.addfont(font_file)  # pyrefly: ignore
+    report.added = sorted(set(_font_index()) - original_fonts)
+    if verbose:
+        print(report)
 
-    new_fonts = set(available_fonts()) - original_fonts
-    if new_fonts:
-        print(f"Added the following fonts: {', '.join(new_fonts)}")
-    else:
-        print("No new fonts added.")
+    return report
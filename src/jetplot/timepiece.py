@@ -1,23 +1,133 @@
 """Utilities for dealing with time."""
 
+import inspect
+import math
+import os
+import threading
 import time
-from collections.abc import Callable
-from functools import wraps
-from typing import Any
+import tracemalloc
+import types
+import weakref
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial, wraps
+from typing import Any, Literal
 
 import numpy as np
+from matplotlib.ticker import FuncFormatter
+from numpy.typing import ArrayLike, NDArray
+
+__all__ = [
+    "hrtime",
+    "hrtime_array",
+    "hrtime_formatter",
+    "Stopwatch",
+    "Checkpoint",
+    "Profiler",
+    "RunningStats",
+    "profile",
+]
+
+
+@dataclass
+class Checkpoint:
+    """Time and memory used between two Stopwatch checkpoints.
+
+    Attributes:
+      name: Name of the checkpoint.
+      elapsed: Time (in seconds) since the previous checkpoint.
+      peak: Peak memory (in bytes) above the usage at the previous checkpoint.
+      net: Change in memory usage (in bytes) since the previous checkpoint.
+    """
+
+    name: str
+    elapsed: float
+    peak: int | None = None
+    net: int | None = None
+
+
+def _hrbytes(n: int) -> str:
+    """Formats a number of bytes as a human readable string."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024:
+            return f"{n:g} {unit}"
+        n = round(n / 1024, 1)  # pyrefly: ignore
+    return f"{n:g} TiB"
+
 
-__all__ = ["hrtime", "Stopwatch", "profile"]
+def _rss() -> tuple[int, int]:
+    """Current and peak resident set size (in bytes), read from /proc."""
+    current = peak = 0
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                current = int(line.split()[1]) * 1024
+            elif line.startswith("VmHWM:"):
+                peak = int(line.split()[1]) * 1024
+    return current, peak
+
+
+def _reset_rss_peak() -> bool:
+    """Resets the peak resident set size, returning whether that is supported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
 
 
 class Stopwatch:
-    """Simple timer utility for measuring code execution time."""
+    """Simple timer utility for measuring code execution time.
+
+    Args:
+      name: Name of the stopwatch, included in printed messages (Default: "").
+      memory: Optionally also track memory use between checkpoints, either with
+        "tracemalloc" (Python allocations, accurate but slows down allocations)
+        or "rss" (resident set size from /proc, cheap but coarse and Linux only).
+        With "rss", peaks are only recorded if the peak can be reset (through
+        /proc/self/clear_refs), and are None otherwise.
+      verbose: Print a message at each checkpoint (Default: True).
+    """
 
-    def __init__(self, name: str = "") -> None:
+    def __init__(
+        self,
+        name: str = "",
+        memory: Literal["tracemalloc", "rss"] | None = None,
+        verbose: bool = True,
+    ) -> None:
         self.name = name
+        self.memory = memory
+        self.verbose = verbose
+        self.checkpoints: list[Checkpoint] = []
+        self._started_tracing = False
+        self._track_peak = memory is not None
+
+        if memory == "tracemalloc":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        elif memory == "rss":
+            if not os.path.exists("/proc/self/status"):
+                raise RuntimeError("memory='rss' requires the /proc filesystem")
+            # without a reset, the peak is that of the whole process lifetime
+            self._track_peak = _reset_rss_peak()
+        elif memory is not None:
+            raise ValueError("memory must be 'tracemalloc', 'rss' or None")
+
+        self._usage = self._memory()[0]
         self.start = time.perf_counter()
         self.absolute_start = time.perf_counter()
 
+    def _memory(self) -> tuple[int, int]:
+        if self.memory == "tracemalloc":
+            return tracemalloc.get_traced_memory()
+        if self.memory == "rss":
+            return _rss()
+        return 0, 0
+
     def __str__(self) -> str:
         return "\u231a  Stopwatch for: " + self.name
 
@@ -28,15 +138,356 @@ class Stopwatch:
         self.start = time.perf_counter()
         return elapsed
 
-    def checkpoint(self, name: str = "") -> None:
-        print(f"{self.name} {name} took {hrtime(self.elapsed)}".strip())
+    def checkpoint(self, name: str = "") -> Checkpoint:
+        """Records (and prints) the time and memory used since the last checkpoint."""
+        result = Checkpoint(name, self.elapsed)
+        message = f"{self.name} {name} took {hrtime(result.elapsed)}".strip()
+
+        if self.memory is not None:
+            current, peak = self._memory()
+            result.net = current - self._usage
+            if self._track_peak:
+                result.peak = max(peak - self._usage, 0)
+                message += f", peak {_hrbytes(result.peak)}"
+            message += f", net {_hrbytes(result.net)}"
+
+            self._usage = current
+            if self.memory == "tracemalloc":
+                tracemalloc.reset_peak()
+            elif self._track_peak:
+                _reset_rss_peak()
+
+        self.checkpoints.append(result)
+        if self.verbose:
+            print(message)
+
+        return result
 
     def __enter__(self) -> "Stopwatch":
         return self
 
     def __exit__(self, *_: object) -> None:
-        total = hrtime(time.perf_counter() - self.absolute_start)
-        print(f"{self.name} Finished! \u2714\nTotal elapsed time: {total}")
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+        if self.verbose:
+            total = hrtime(time.perf_counter() - self.absolute_start)
+            print(f"{self.name} Finished! \u2714\nTotal elapsed time: {total}")
+
+
+class RunningStats:
+    """Bounded-memory running statistics for a stream of samples.
+
+    The mean and variance are updated with Welford's algorithm, and percentiles
+    are estimated from a histogram with logarithmically spaced buckets (with a
+    relative error of about ``2 ** (1 / buckets_per_octave) - 1``). Optionally,
+    the most recent samples are kept in a preallocated ring buffer. Updates are
+    thread-safe.
+
+    Args:
+      recent: Number of recent samples to keep (Default: 0).
+      buckets_per_octave: Resolution of the percentile histogram (Default: 32).
+    """
+
+    def __init__(self, recent: int = 0, buckets_per_octave: int = 32) -> None:
+        self.count = 0
+        self.mean = math.nan
+        self.min = math.nan
+        self.max = math.nan
+        self._m2 = 0.0
+        self._bpo = buckets_per_octave
+        self._buckets: dict[int, int] = {}
+        self._zeros = 0
+        self._recent = np.empty(recent)
+        self._filled = 0
+        self._lock = threading.Lock()
+
+    def add(self, x: float) -> None:
+        """Adds a sample."""
+        with self._lock:
+            self.count += 1
+            if self.count == 1:
+                self.mean = self.min = self.max = x
+                self._m2 = 0.0
+            else:
+                delta = x - self.mean
+                self.mean += delta / self.count
+                self._m2 += delta * (x - self.mean)
+                self.min = min(self.min, x)
+                self.max = max(self.max, x)
+
+            if x > 0:
+                key = math.floor(math.log2(x) * self._bpo)
+                self._buckets[key] = self._buckets.get(key, 0) + 1
+            else:
+                self._zeros += 1
+
+            if self._recent.size:
+                self._recent[self._filled % self._recent.size] = x
+                self._filled += 1
+
+    @property
+    def var(self) -> float:
+        """Population variance of the samples."""
+        return self._m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the samples."""
+        return math.sqrt(self.var)
+
+    @property
+    def recent(self) -> np.ndarray:
+        """The most recent samples, from oldest to newest."""
+        size = self._recent.size
+        if self._filled <= size:
+            return self._recent[: self._filled].copy()
+        return np.roll(self._recent, -(self._filled % size))
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Merges the samples summarized by another instance into this one."""
+        # other may still be receiving samples, so read a consistent copy of it
+        with other._lock:
+            count, mean, lo, hi, m2 = (
+                other.count,
+                other.mean,
+                other.min,
+                other.max,
+                other._m2,
+            )
+            buckets, zeros, recent = dict(other._buckets), other._zeros, other.recent
+
+        with self._lock:
+            if count == 0:
+                return self
+
+            total = self.count + count
+            if self.count == 0:
+                self.mean, self.min, self.max = mean, lo, hi
+                self._m2 = m2
+            else:
+                delta = mean - self.mean
+                self._m2 += m2 + delta**2 * self.count * count / total
+                self.mean += delta * count / total
+                self.min = min(self.min, lo)
+                self.max = max(self.max, hi)
+
+            for key, n in buckets.items():
+                self._buckets[key] = self._buckets.get(key, 0) + n
+            self._zeros += zeros
+
+            if self._recent.size:
+                samples = np.concatenate([self.recent, recent])
+                samples = samples[-self._recent.size :]
+                self._recent[: samples.size] = samples
+                self._filled = samples.size
+
+            self.count = total
+            return self
+
+    def percentile(self, q: float) -> float:
+        """Estimates the q-th percentile (0 <= q <= 100) of the samples."""
+        if not self.count:
+            return math.nan
+
+        rank = q / 100 * (self.count - 1)
+        cumulative = self._zeros
+        if rank < cumulative:
+            return 0.0 if self.min <= 0 else self.min
+
+        for key in sorted(self._buckets):
+            cumulative += self._buckets[key]
+            if rank < cumulative:
+                value = 2 ** ((key + 0.5) / self._bpo)
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+
+class _Node:
+    """Timing statistics for a single section in a Profiler tree."""
+
+    __slots__ = ("children", "name", "stats", "total")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.children: dict[str, _Node] = {}
+        self.total = 0
+        self.stats = RunningStats()
+
+    def add(self, duration: int) -> None:
+        self.total += duration
+        self.stats.add(duration)
+
+    @property
+    def self_time(self) -> int:
+        return self.total - sum(child.total for child in self.children.values())
+
+
+# sections entered in the current thread or asyncio task, as (profiler, node,
+# start time) frames; a tuple, so that tasks inheriting it never share changes
+_sections: ContextVar[tuple[tuple[Any, Any, int], ...]] = ContextVar(
+    "jetplot_sections", default=()
+)
+
+
+class _Section:
+    """Context manager (and decorator) that times a named Profiler section."""
+
+    __slots__ = ("name", "profiler")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        profiler = self.profiler
+        stack = _sections.get()
+        if not profiler.enabled:
+            _sections.set((*stack, (profiler, None, 0)))
+            return
+
+        parent = profiler.root
+        for owner, node, _ in reversed(stack):
+            if owner is profiler and node is not None:
+                parent = node
+                break
+
+        node = parent.children.get(self.name)
+        if node is None:
+            with profiler._lock:
+                node = parent.children.setdefault(self.name, _Node(self.name))
+
+        _sections.set((*stack, (profiler, node, time.perf_counter_ns())))
+
+    def __exit__(self, *_: object) -> None:
+        stop = time.perf_counter_ns()
+        stack = _sections.get()
+        _sections.set(stack[:-1])
+        _, node, start = stack[-1]
+        if node is not None:
+            with self.profiler._lock:
+                node.add(stop - start)
+
+    def __call__(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        # coroutines are timed until they finish, not just while being created
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.profiler.enabled:
+                    return await func(*args, **kwargs)
+                with self:
+                    return await func(*args, **kwargs)
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.profiler.enabled:
+                    return func(*args, **kwargs)
+                with self:
+                    return func(*args, **kwargs)
+
+        return wrapper
+
+
+class Profiler:
+    """Hierarchical profiler that records a tree of nested, timed sections.
+
+    Sections are timed with ``time.perf_counter_ns`` and nest according to the
+    order in which they are entered (tracked separately for each thread and
+    asyncio task). Decorated coroutine functions are timed until their
+    coroutine finishes. When the profiler is disabled, sections cost little
+    more than a function call.
+
+    Example:
+      >>> prof = Profiler()
+      >>> with prof.section("load"):
+      ...     with prof.section("parse"):
+      ...         pass
+      >>> @prof("plot")
+      ... def plot(): ...
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.root = _Node("")
+        self._lock = threading.Lock()
+
+    def section(self, name: str) -> _Section:
+        """Returns a context manager (or decorator) that times a named section."""
+        return _Section(self, name)
+
+    def __call__(self, name: str | Callable[..., Any]) -> Any:
+        """Decorates a function, using either the given name or its qualified name."""
+        if callable(name):
+            return _Section(self, name.__qualname__)(name)
+        return _Section(self, name)
+
+    def reset(self) -> None:
+        """Clears all recorded timings."""
+        with self._lock:
+            self.root = _Node("")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the timing tree as nested dictionaries (times in seconds)."""
+
+        def convert(node: _Node) -> dict[str, Any]:
+            return {
+                "name": node.name,
+                "count": node.stats.count,
+                "total": node.total * 1e-9,
+                "self": node.self_time * 1e-9,
+                "min": node.stats.min * 1e-9,
+                "max": node.stats.max * 1e-9,
+                "p50": node.stats.percentile(50) * 1e-9,
+                "p90": node.stats.percentile(90) * 1e-9,
+                "p99": node.stats.percentile(99) * 1e-9,
+                "children": [convert(child) for child in node.children.values()],
+            }
+
+        return {"children": [convert(c) for c in self.root.children.values()]}
+
+    def collapsed(self) -> str:
+        """Returns the self time of each section (in nanoseconds) in the collapsed
+        stack format used by flame graph tools (e.g. ``flamegraph.pl``)."""
+        lines = []
+
+        def visit(node: _Node, prefix: str) -> None:
+            path = f"{prefix};{node.name}" if prefix else node.name
+            lines.append(f"{path} {node.self_time}")
+            for child in node.children.values():
+                visit(child, path)
+
+        for child in self.root.children.values():
+            visit(child, "")
+
+        return "\n".join(lines)
+
+    def summary(self) -> None:
+        """Prints the timing tree."""
+
+        def visit(node: _Node, depth: int) -> None:
+            print(
+                f"{'  ' * depth}{node.name}: {hrtime(node.total * 1e-9)} total, "
+                f"{hrtime(node.self_time * 1e-9)} self, {node.stats.count} calls"
+            )
+            for child in node.children.values():
+                visit(child, depth + 1)
+
+        for child in self.root.children.values():
+            visit(child, 0)
+
+
+# (duration in seconds, label) of the units that hrtime breaks times into
+_HRTIME_UNITS = (
+    (7 * 60 * 60 * 24, "weeks"),
+    (60 * 60 * 24, "days"),
+    (60 * 60, "hours"),
+    (60, "min."),
+)
 
 
 def hrtime(t: float) -> str:
@@ -48,70 +499,246 @@ def hrtime(t: float) -> str:
     Returns:
       time: string, Human readable formatted value of the given time.
     """
-
-    # weeks
-    if t >= 7 * 60 * 60 * 24:
-        weeks = np.floor(t / (7 * 60 * 60 * 24))
-        timestr = f"{weeks:0.0f} weeks, " + hrtime(t % (7 * 60 * 60 * 24))
-
-    # days
-    elif t >= 60 * 60 * 24:
-        days = np.floor(t / (60 * 60 * 24))
-        timestr = f"{days:0.0f} days, " + hrtime(t % (60 * 60 * 24))
-
-    # hours
-    elif t >= 60 * 60:
-        hours = np.floor(t / (60 * 60))
-        timestr = f"{hours:0.0f} hours, " + hrtime(t % (60 * 60))
-
-    # minutes
-    elif t >= 60:
-        minutes = np.floor(t / 60)
-        timestr = f"{minutes:0.0f} min., " + hrtime(t % 60)
+    t = float(t)
+    timestr = ""
+
+    # weeks, days, hours and minutes
+    for size, label in _HRTIME_UNITS:
+        if t >= size:
+            count = t / size
+            timestr += (
+                f"{math.floor(count) if count < math.inf else count:0.0f} {label}, "
+            )
+            t %= size
 
     # seconds
-    elif (t >= 1) | (t == 0):
-        timestr = f"{t:g} s"
+    if t >= 1 or t == 0:
+        return f"{timestr}{t:g} s"
 
     # milliseconds
     elif t >= 1e-3:
-        timestr = f"{t * 1e3:g} ms"
+        return f"{timestr}{t * 1e3:g} ms"
 
     # microseconds
     elif t >= 1e-6:
-        timestr = f"{t * 1e6:g} \u03bcs"
+        return f"{timestr}{t * 1e6:g} \u03bcs"
 
     # nanoseconds or smaller
-    else:
-        timestr = f"{t * 1e9:g} ns"
+    return f"{timestr}{t * 1e9:g} ns"
+
 
-    return timestr
+def hrtime_array(t: ArrayLike) -> NDArray[np.str_]:
+    """Vectorized version of :func:`hrtime` for arrays of times (in seconds).
 
+    The breakdown of each time into units is computed with array operations, so
+    only the final string formatting is done element by element.
 
-def profile(func: Callable[..., Any]) -> Callable[..., Any]:
-    """Timing (profile) decorator for a function."""
-    calls = list()
+    Args:
+      t: array_like, Times in seconds.
+
+    Returns:
+      times: Array (with the same shape as t) of human readable strings.
+    """
+    remainder = np.array(t, dtype=np.float64).ravel()
+    if remainder.size == 0:
+        return np.array([], dtype=np.str_).reshape(np.shape(t))
+
+    prefixes = [""] * remainder.size
+    for size, label in _HRTIME_UNITS:
+        mask = remainder >= size
+        if mask.any():
+            with np.errstate(invalid="ignore"):
+                counts = np.floor(remainder[mask] / size)
+                remainder[mask] %= size
+            for index, count in zip(np.flatnonzero(mask), counts.tolist(), strict=True):
+                prefixes[index] += f"{count:0.0f} {label}, "
+
+    seconds = (remainder >= 1) | (remainder == 0)
+    scale = np.select(
+        [seconds, remainder >= 1e-3, remainder >= 1e-6], [1.0, 1e3, 1e6], 1e9
+    )
+    suffix = np.select(
+        [seconds, remainder >= 1e-3, remainder >= 1e-6], [0, 1, 2], 3
+    ).tolist()
+    units = (" s", " ms", " \u03bcs", " ns")
+
+    values = (remainder * scale).tolist()
+    strings = [
+        f"{prefix}{value:g}{units[unit]}"
+        for prefix, value, unit in zip(prefixes, values, suffix, strict=True)
+    ]
+    return np.array(strings, dtype=np.str_).reshape(np.shape(t))
+
+
+def hrtime_formatter() -> FuncFormatter:
+    """Matplotlib tick formatter that labels a time axis (in seconds) with hrtime.
+
+    Example:
+      >>> ax.yaxis.set_major_formatter(hrtime_formatter())
+    """
+    return FuncFormatter(lambda t, _: hrtime(t))
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        tstart = time.perf_counter()
-        results = func(*args, **kwargs)
-        tstop = time.perf_counter()
-        calls.append(tstop - tstart)
-        return results
+
+@types.coroutine
+def _timed_steps(coro: Coroutine[Any, Any, Any], clock: Callable[[], float]) -> Any:
+    """Runs a coroutine, also returning the ``clock`` time spent in its own steps
+    (excluding time spent suspended, e.g. while other tasks run)."""
+    elapsed = 0.0
+    value: Any = None
+    error: BaseException | None = None
+
+    while True:
+        start = clock()
+        try:
+            future = coro.send(value) if error is None else coro.throw(error)
+        except StopIteration as stop:
+            return stop.value, elapsed + clock() - start
+        elapsed += clock() - start
+
+        # anything thrown into this generator (including cancellation) is
+        # passed on to the coroutine
+        try:
+            value, error = (yield future), None
+        except BaseException as exc:  # noqa: BLE001
+            value, error = None, exc
+
+
+class _ThreadStats:
+    """Per-thread (wall, cpu) statistics of a profiled function."""
+
+    __slots__ = ("__weakref__", "value")
+
+    def __init__(self, wall: RunningStats, cpu: RunningStats) -> None:
+        self.value = wall, cpu
+
+
+def profile(
+    func: Callable[..., Any] | None = None,
+    *,
+    stream: bool = False,
+    recent: int = 0,
+    cpu: bool = False,
+) -> Any:
+    """Timing (profile) decorator for a function.
+
+    By default, every call duration is stored in the ``calls`` list of the
+    decorated function. With ``stream=True``, durations are only summarized by
+    a :class:`RunningStats` instance, so memory use stays bounded for functions
+    that are called millions of times.
+
+    Coroutine functions are supported, in which case the time until the awaited
+    coroutine completes is measured. Statistics are accumulated separately in
+    each thread and merged when read, and the statistics of threads that exit
+    are folded into a single accumulator.
+
+    Args:
+      func: The function to profile.
+      stream: If True, do not keep a list of every call duration (Default: False).
+      recent: Number of recent call durations to keep in a ring buffer (Default: 0).
+      cpu: If True, also record the CPU time of each call, measured with
+        ``time.thread_time`` (Default: False). For coroutines, this only includes
+        time spent running the coroutine itself, not other tasks while it awaits.
+    """
+    if func is None:
+        return partial(profile, stream=stream, recent=recent, cpu=cpu)
+
+    calls: list[float] | None = None if stream else []
+
+    # statistics of the live threads, and of all threads that have exited
+    accumulators: dict[int, tuple[RunningStats, RunningStats]] = {}
+    retired = RunningStats(recent), RunningStats()
+    local = threading.local()
+    lock = threading.RLock()
+
+    def retire(key: int, wall_stats: RunningStats, cpu_stats: RunningStats) -> None:
+        with lock:
+            retired[0].merge(wall_stats)
+            retired[1].merge(cpu_stats)
+            del accumulators[key]
+
+    def record(wall: float, cpu_time: float | None = None) -> None:
+        try:
+            wall_stats, cpu_stats = local.stats.value
+        except AttributeError:
+            local.stats = _ThreadStats(RunningStats(recent), RunningStats())
+            wall_stats, cpu_stats = local.stats.value
+            key = id(local.stats)
+            with lock:
+                accumulators[key] = local.stats.value
+            # the thread-local value is dropped when the thread exits
+            weakref.finalize(local.stats, retire, key, wall_stats, cpu_stats)
+
+        wall_stats.add(wall)
+        if cpu_time is not None:
+            cpu_stats.add(cpu_time)
+        if calls is not None:
+            calls.append(wall)
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            tstart = time.perf_counter()
+            if cpu:
+                results, cpu_time = await _timed_steps(
+                    func(*args, **kwargs), time.thread_time
+                )
+            else:
+                results, cpu_time = await func(*args, **kwargs), None
+            record(time.perf_counter() - tstart, cpu_time)
+            return results
+
+    else:
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cstart = time.thread_time() if cpu else 0.0
+            tstart = time.perf_counter()
+            results = func(*args, **kwargs)
+            tstop = time.perf_counter()
+            record(tstop - tstart, time.thread_time() - cstart if cpu else None)
+            return results
+
+    def stats() -> RunningStats:
+        merged = RunningStats(recent)
+        with lock:
+            for wall_stats, _ in [retired, *accumulators.values()]:
+                merged.merge(wall_stats)
+        return merged
+
+    def cpu_stats() -> RunningStats:
+        merged = RunningStats()
+        with lock:
+            for _, cpu_stats in [retired, *accumulators.values()]:
+                merged.merge(cpu_stats)
+        return merged
+
+    def _serr(s: RunningStats) -> float:
+        return s.std / math.sqrt(s.count) if s.count else math.nan
 
     def mean() -> float:
-        return float(np.mean(calls))
+        return stats().mean
 
     def serr() -> float:
-        return float(np.std(calls) / np.sqrt(len(calls)))
+        return _serr(stats())
 
-    def summary() -> None:
-        print(f"Runtimes: {hrtime(mean())} \u00b1 {hrtime(serr())}")
+    def percentile(q: float) -> float:
+        return stats().percentile(q)
 
-    wrapper.__dict__["calls"] = calls
+    def summary() -> None:
+        message = f"Runtimes: {hrtime(mean())} \u00b1 {hrtime(serr())}"
+        if cpu:
+            cs = cpu_stats()
+            message += f" (CPU: {hrtime(cs.mean)} \u00b1 {hrtime(_serr(cs))})"
+        print(message)
+
+    if calls is not None:
+        wrapper.__dict__["calls"] = calls
+    wrapper.__dict__["stats"] = stats
+    wrapper.__dict__["cpu_stats"] = cpu_stats
     wrapper.__dict__["mean"] = mean
     wrapper.__dict__["serr"] = serr
+    wrapper.__dict__["percentile"] = percentile
     wrapper.__dict__["summary"] = summary
 
     return wrapper
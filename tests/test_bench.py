@@ -0,0 +1,64 @@
+"""Tests for the bench module."""
+
+import numpy as np
+
+from jetplot import bench
+
+
+def test_benchmark():
+    result = bench.benchmark(lambda: sum(range(100)), name="sum", repeat=5, memory=True)
+
+    assert result.name == "sum"
+    assert result.number >= 1
+    assert len(result.samples) + result.outliers == 5
+    assert result.peak_memory is not None
+    lower, upper = result.ci()
+    assert lower <= result.mean <= upper
+    assert "sum()" in str(result)
+
+
+def test_run_suite_and_compare(tmp_path):
+    suite = tmp_path / "bench_example.py"
+    suite.write_text(
+        "from jetplot.bench import params\n"
+        "\n"
+        "@params(n=[10, 100])\n"
+        "def bench_arange(n):\n"
+        "    return lambda: list(range(n))\n"
+        "\n"
+        "def track_answer():\n"
+        "    return 42\n"
+    )
+
+    results = bench.run_suite(tmp_path, repeat=3, min_time=0.001)
+    assert [r.key for r in results] == [
+        'bench_arange({"n": 10})',
+        'bench_arange({"n": 100})',
+        "track_answer({})",
+    ]
+    assert results[-1].value == 42
+
+    filepath = tmp_path / "results.json"
+    bench.save_results(results, filepath)
+    loaded = bench.load_results(filepath)
+    assert [r.key for r in loaded] == [r.key for r in results]
+
+    # A synthetic 2x slowdown is flagged as a regression.
+    baseline = bench.BenchmarkResult(
+        "f", samples=list(np.full(10, 1.0) + 0.01 * np.arange(10))
+    )
+    slower = bench.BenchmarkResult(
+        "f", samples=list(np.full(10, 2.0) + 0.01 * np.arange(10))
+    )
+    (comparison,) = bench.compare([baseline], [slower])
+    assert comparison.regression
+    assert np.allclose(comparison.ratio, 2.045 / 1.045)
+
+    (comparison,) = bench.compare([baseline], [baseline])
+    assert not comparison.significant
+
+
+def test_main_compare(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    bench.save_results([bench.BenchmarkResult("f", samples=[1.0, 1.1, 0.9])], baseline)
+    assert bench.main(["compare", str(baseline), str(baseline)]) == 0
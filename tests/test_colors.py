@@ -1,7 +1,9 @@
 """Tests the colors module."""
 
+import matplotlib
+import numpy as np
 from matplotlib.axes import Axes
-from matplotlib.colors import to_rgb
+from matplotlib.colors import LogNorm, to_hex, to_rgb, to_rgba
 from matplotlib.figure import Figure
 
 from jetplot import colors
@@ -35,3 +37,141 @@ def test_rainbow():
     assert isinstance(rainbow, colors.Palette)
     assert len(rainbow) == 13
     assert len(set(rainbow)) == 13
+
+
+def test_cmap_colors():
+    """Tests sampling colors from a colormap."""
+    pal = colors.cmap_colors("viridis", 5)
+    assert len(pal) == 5
+    assert np.allclose(pal[0], matplotlib.colormaps["viridis"](0.0))
+
+    # Samples are cached and read-only.
+    assert colors.cmap_colors("viridis", 5)[0].base is pal[0].base
+    assert not pal[0].flags.writeable
+
+    # Colormap instances are also supported.
+    pal = colors.cmap_colors(matplotlib.colormaps["magma"], 3, vmin=0.2)
+    assert np.allclose(pal[0], matplotlib.colormaps["magma"](0.2))
+
+
+def test_palette_cmap():
+    """Tests that palette colormaps are cached by content."""
+    cmap = colors.blue.cmap
+    hits = colors._palette_cmap.cache_info().hits
+    same = colors.Palette(list(colors.blue)).cmap
+    assert colors._palette_cmap.cache_info().hits == hits + 1
+    assert colors.red.cmap is not cmap
+    assert np.allclose(cmap(0.0), to_rgba(colors.blue[0]))
+
+    # Each access returns a copy, so modifying it does not affect other palettes.
+    assert same is not cmap
+    cmap.name = "modified"
+    assert same.name == colors.blue.cmap.name == ""
+
+
+def test_palette_rgba():
+    """Tests the array representation of a Palette."""
+    rs = np.random.RandomState(0)
+    rgb = rs.rand(50, 3)
+    pal = colors.Palette(list(map(tuple, rgb)))
+
+    assert pal.rgba.shape == (50, 4)
+    assert pal.rgba.dtype == np.float32
+    assert np.allclose(pal.rgba[:, :3], rgb)
+    assert pal.hex == [to_hex(c) for c in rgb]
+
+    # Hex strings are parsed back to the same values.
+    assert np.allclose(colors.Palette(pal.hex).rgba, pal.rgba, atol=1 / 255)
+
+    # The array is recomputed after the palette is modified.
+    pal.append("#ff000080")
+    assert pal.rgba.shape == (51, 4)
+    assert np.allclose(pal.rgba[-1], to_rgba("#ff000080"))
+
+    pal = colors.Palette.from_rgba(rgb)
+    assert len(pal) == 50
+    assert np.allclose(pal.rgba[:, :3], rgb)
+
+
+def test_palette_map():
+    """Tests mapping values to colors through a Palette."""
+    pal = colors.blue
+    values = np.array([[-1.0, 0.0, 0.25], [0.5, 1.0, np.nan]])
+
+    computed = pal.map(values, vmin=0.0, vmax=1.0)
+    expected = pal.cmap(np.ma.masked_invalid(values))
+    assert computed.shape == (2, 3, 4)
+    assert computed.dtype == np.float32
+    assert np.allclose(computed, expected)
+
+    # Normalization objects and uint8 output.
+    norm = LogNorm(vmin=1.0, vmax=100.0)
+    data = np.array([1.0, 10.0, 100.0])
+    computed = pal.map(data, norm=norm, dtype=np.uint8)
+    assert computed.dtype == np.uint8
+    assert np.allclose(computed, np.round(pal.cmap(norm(data)) * 255))
+
+    # Output buffers are reused.
+    out = np.empty((3, 4), dtype=np.float32)
+    assert pal.map(data, out=out) is out
+
+
+def test_distinct_colors(tmp_path, monkeypatch):
+    """Tests generating perceptually distinct colors."""
+    monkeypatch.setenv("JETPLOT_CACHE_DIR", str(tmp_path))
+
+    assert np.allclose(
+        colors._srgb_to_oklab([1.0, 1.0, 1.0]), [1.0, 0.0, 0.0], atol=1e-4
+    )
+
+    pal = colors.distinct_colors(20, resolution=16)
+    assert len(pal) == 20
+    assert len(set(pal.hex)) == 20
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+    # Greedy sampling means smaller palettes are prefixes of larger ones, and
+    # are served from the disk cache.
+    colors._distinct_rgb.cache_clear()
+    assert colors.distinct_colors(5, resolution=16).hex == pal.hex[:5]
+
+    # A corrupt cache file is a cache miss.
+    (filepath,) = tmp_path.glob("*.npy")
+    filepath.write_bytes(b"not an array")
+    colors._distinct_rgb.cache_clear()
+    assert colors.distinct_colors(5, resolution=16).hex == pal.hex[:5]
+
+    # Colors are computed without the cache if it cannot be written.
+    monkeypatch.setenv("JETPLOT_CACHE_DIR", str(filepath / "cache"))
+    colors._distinct_rgb.cache_clear()
+    assert colors.distinct_colors(5, resolution=16).hex == pal.hex[:5]
+
+    # Colors are far apart from each other in OKLab.
+    lab = colors._srgb_to_oklab(pal.rgba[:, :3])
+    distances = np.linalg.norm(lab[:, None] - lab[None], axis=-1)
+    assert np.min(distances[np.triu_indices(20, k=1)]) > 0.1
+
+
+def test_cubehelix_batch():
+    """Tests that batched cubehelix palettes match the scalar function."""
+    starts = np.linspace(0.0, 3.0, 4)
+    rots = np.array([[-0.5], [0.4]])
+
+    computed = colors.cubehelix_batch(10, start=starts, rot=rots, hue=0.6)
+    assert computed.shape == (8, 10, 3)
+
+    expected = [
+        colors.cubehelix(10, start=start, rot=rot, hue=0.6)
+        for rot in rots.ravel()
+        for start in starts
+    ]
+    assert np.allclose(computed, expected)
+
+
+def test_cubehelix_inverse():
+    """Tests recovering the cubehelix parameter from colors."""
+    lambdas = np.array([0.1, 0.5, 0.9])
+    rgb = np.array(colors.cubehelix(3, vmin=0.1, vmax=0.9))
+
+    computed, distance = colors.cubehelix_inverse(rgb, return_distance=True)
+    assert np.allclose(computed, lambdas, atol=1e-3)
+    assert np.all(distance < 1e-3)
@@ -82,3 +82,11 @@ def test_violinplot():
     # Expect at least one polygon from violin body
     assert len(ax.collections) > 0
     plt.close(fig)
+
+
+def test_ellipse():
+    rs = np.random.RandomState(0)
+    fig, ax = plt.subplots()
+    ellipse = plots.ellipse(rs.randn(100), rs.randn(100), fig=fig, ax=ax)
+    assert ellipse in ax.patches
+    plt.close(fig)
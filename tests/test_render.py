@@ -0,0 +1,212 @@
+"""Tests the batch renderer."""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+from matplotlib import rcParams
+from matplotlib.image import imread
+
+from jetplot import images, plots
+from jetplot.render import (
+    AsyncRenderer,
+    RenderJob,
+    _attach,
+    _SharedArrays,
+    render_async,
+    render_batch,
+)
+from jetplot.style import Style, dark_style, light_style
+
+
+def test_shared_arrays():
+    shared = _SharedArrays(min_bytes=100)
+    big, small = np.random.randn(20, 10), np.arange(3)
+    try:
+        refs = shared.share(((big, small), {"y": big}))
+        assert refs[0][0] is refs[1]["y"]
+        assert refs[0][1] is small
+        assert len(shared.blocks) == 1
+
+        blocks = []
+        (array, _), _ = _attach(refs, blocks)
+        assert np.array_equal(array, big)
+        assert not array.flags.writeable
+        del array
+        for block in blocks:
+            block.close()
+    finally:
+        shared.close()
+
+
+def test_render_batch(tmp_path):
+    x = np.linspace(0, 1, 1000)
+    ys = [np.sin(x), np.cos(x)]
+    jobs = [
+        (plots.lines, (x, ys), tmp_path / "lines.png"),
+        (images.img, (np.random.randn(10, 10),), tmp_path / "img.svg", {"cbar": True}),
+        RenderJob(plots.hist, (x,), tmp_path / "hist.pdf", {"bins": "nope"}),
+        RenderJob(plots.lines, (x, ys), tmp_path / "small.png", figsize=(2, 1)),
+    ]
+    results = render_batch(
+        jobs, style=Style({"figure.dpi": 50}), max_workers=2, shared_min_bytes=0
+    )
+
+    assert [r.path for r in results] == [
+        str(tmp_path / name)
+        for name in ("lines.png", "img.svg", "hist.pdf", "small.png")
+    ]
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert "ValueError" in results[2].error
+    assert all(r.elapsed > 0 for r in results if r.ok)
+
+    assert (tmp_path / "img.svg").read_text().startswith("<?xml")
+    assert not (tmp_path / "hist.pdf").exists()
+
+    # the style and figure size are applied in the workers
+    assert imread(tmp_path / "small.png").shape[:2] == (50, 100)
+
+
+def test_render_batch_unpicklable(tmp_path):
+    def local(fig):
+        fig.add_subplot().plot([0, 1])
+
+    jobs = [
+        (local, (), tmp_path / "local.png"),
+        (
+            plots.lines,
+            ([0, 1], [[0, 1]]),
+            tmp_path / "lock.png",
+            {"lock": threading.Lock()},
+        ),
+        (plots.lines, ([0, 1], [[0, 1]]), tmp_path / "lines.png"),
+    ]
+    results = render_batch(jobs, max_workers=1)
+
+    assert [r.ok for r in results] == [False, False, True]
+    assert "pickle" in results[0].error and "pickle" in results[1].error
+    assert (tmp_path / "lines.png").exists()
+
+
+def test_async_renderer():
+    x = np.linspace(0, 1, 100)
+    renderer = AsyncRenderer(max_workers=2, max_pending=1, cache_size=2)
+
+    async def main():
+        first, second, third = await asyncio.gather(
+            renderer.render(plots.lines, x, [x], figsize=(2, 1)),
+            renderer.render(plots.lines, x, [x], figsize=(2, 1)),
+            renderer.render(plots.lines, x, [x**2], figsize=(2, 1)),
+        )
+        assert first[:4] == b"\x89PNG"
+        assert first == second != third
+
+        # identical requests are shared or served from the cache
+        assert (renderer.hits, renderer.misses) == (1, 2)
+        assert (
+            await renderer.render(plots.lines, x, [x.copy()], figsize=(2, 1)) == first
+        )
+        assert renderer.hits == 2
+
+        svg = await renderer.render(plots.lines, x, [x], fmt="svg")
+        assert svg.startswith(b"<?xml")
+        assert len(renderer._cache) == 2
+
+        with pytest.raises(ValueError):
+            await renderer.render(plots.hist, x, bins="nope")
+        assert not renderer._inflight
+
+        assert (await render_async(plots.hist, x))[:4] == b"\x89PNG"
+
+    try:
+        asyncio.run(main())
+    finally:
+        renderer.close()
+
+
+def test_async_renderer_cancel():
+    x = np.linspace(0, 1, 100)
+    renderer = AsyncRenderer(max_workers=1)
+
+    async def main():
+        first = asyncio.ensure_future(renderer.render(plots.lines, x, [x]))
+        second = asyncio.ensure_future(renderer.render(plots.lines, x, [x]))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        # the shared render outlives the caller that started it
+        assert (await second)[:4] == b"\x89PNG"
+        assert first.cancelled()
+        assert (renderer.hits, renderer.misses) == (1, 1)
+        assert not renderer._inflight and len(renderer._cache) == 1
+
+    try:
+        asyncio.run(main())
+    finally:
+        renderer.close()
+
+
+def test_async_renderer_style():
+    renderer = AsyncRenderer(max_workers=1, style=dark_style())
+
+    async def main():
+        # the render does not wait for the style context around it to exit
+        with light_style():
+            data = await asyncio.wait_for(
+                renderer.render(plots.lines, [0, 1], [[0, 1]]), timeout=10
+            )
+            assert rcParams["axes.facecolor"] == light_style().params["axes.facecolor"]
+        return data
+
+    try:
+        assert asyncio.run(main())[:4] == b"\x89PNG"
+    finally:
+        renderer.close()
+
+
+def test_async_renderer_cache_keys():
+    def make(color):
+        def draw(**kwargs):
+            kwargs["fig"].add_subplot().plot([0, 1], color=color)
+
+        return draw
+
+    class Plot:
+        def __init__(self, color):
+            self.color = color
+
+        def draw(self, **kwargs):
+            kwargs["fig"].add_subplot().plot([0, 1], color=self.color)
+
+    renderer = AsyncRenderer(max_workers=1)
+
+    async def main():
+        red, blue = await asyncio.gather(
+            renderer.render(make("red"), figsize=(1, 1)),
+            renderer.render(make("blue"), figsize=(1, 1)),
+        )
+        assert red != blue
+        assert await renderer.render(make("red"), figsize=(1, 1)) == red
+
+        red, blue = await asyncio.gather(
+            renderer.render(Plot("red").draw, figsize=(1, 1)),
+            renderer.render(Plot("blue").draw, figsize=(1, 1)),
+        )
+        assert red != blue
+
+        # functions that differ only in a constant
+        source = 'lambda **kw: kw["fig"].add_subplot().plot([0, 1], color="{}")'
+        red, blue = eval(source.format("red")), eval(source.format("blue"))
+        assert renderer._key(red, (), {}) != renderer._key(blue, (), {})
+        assert await renderer.render(red) != await renderer.render(blue)
+
+        # inputs that cannot be hashed are rendered without caching
+        lock = threading.Lock()
+        await renderer.render(make("red"), figsize=(1, 1), lock=lock)
+        assert renderer._key(make("red"), (), {"lock": lock}) is None
+
+    try:
+        asyncio.run(main())
+    finally:
+        renderer.close()
@@ -96,3 +96,96 @@ def test_normalize():
     expected = np.stack([x / np.linalg.norm(x) for x in X.T]).T
     computed = signals.normalize(X, axis=0)
     assert np.allclose(expected, computed)
+
+
+def test_participation_ratio_from_data():
+    rs = np.random.RandomState(0)
+    X = rs.randn(200, 5) @ rs.randn(5, 5)
+    expected = signals.participation_ratio(np.cov(X, rowvar=False))
+
+    assert np.allclose(signals.participation_ratio_from_data(X), expected)
+    assert np.allclose(
+        signals.participation_ratio_from_data(X, chunk_size=17), expected
+    )
+
+    # Fewer samples than features uses the Gram matrix instead.
+    W = rs.randn(10, 50)
+    expected = signals.participation_ratio(np.cov(W, rowvar=False))
+    assert np.allclose(signals.participation_ratio_from_data(W), expected)
+
+
+def test_covariance_accumulator_merge():
+    rs = np.random.RandomState(1)
+    X = rs.randn(100, 4)
+
+    left = signals.CovarianceAccumulator(4).update(X[:30])
+    right = signals.CovarianceAccumulator(4).update(X[30:])
+    merged = left.merge(right)
+
+    assert merged.count == 100
+    assert np.allclose(merged.mean, X.mean(axis=0))
+    assert np.allclose(merged.covariance, np.cov(X, rowvar=False))
+
+
+def test_canoncorr_batch():
+    rs = np.random.RandomState(0)
+    Xs = [rs.randn(20, 3) for _ in range(4)]
+    Ys = [rs.randn(20, 2) for _ in range(5)]
+
+    expected = np.stack([[signals.canoncorr(X, Y) for Y in Ys] for X in Xs])
+
+    computed = signals.canoncorr_batch(Xs, Ys)
+    assert computed.shape == (4, 5, 2)
+    assert np.allclose(computed, expected)
+
+    subspaces = [signals.Subspace(X) for X in Xs]
+    threaded = signals.canoncorr_batch(subspaces, Ys, max_workers=2)
+    assert np.allclose(threaded, expected)
+
+    # All pairs within a single collection.
+    pairs = signals.canoncorr_batch(subspaces)
+    assert pairs.shape == (4, 4, 3)
+    assert np.allclose(pairs[np.arange(4), np.arange(4)], 1.0)
+
+
+def test_canoncorr_cholqr():
+    rs = np.random.RandomState(0)
+    X = rs.randn(500, 4)
+    Y = rs.randn(500, 3)
+
+    expected = signals.canoncorr(X, Y)
+    assert np.allclose(signals.canoncorr(X, Y, method="cholqr"), expected)
+    assert np.allclose(
+        signals.canoncorr(X, Y, method="cholqr", chunk_size=64), expected
+    )
+
+    # Ill-conditioned inputs are re-orthogonalized.
+    scales = np.array([1.0, 1e-3, 1e-6, 1e-7])
+    Z = X * scales
+    assert np.allclose(signals.canoncorr(Z, X, method="cholqr"), np.ones(4))
+
+
+def test_normalize_options():
+    rs = np.random.RandomState(0)
+    X = rs.randn(10, 6).astype(np.float32)
+    X[3] = 0.0
+    expected = signals.normalize(X.astype(np.float64))
+
+    # Preserves dtype and handles zero norms.
+    computed = signals.normalize(X)
+    assert computed.dtype == np.float32
+    assert np.all(computed[3] == 0.0)
+    assert np.allclose(computed, expected, atol=1e-6)
+
+    # Chunked along the non-normalized axis, into an output buffer.
+    out = np.empty_like(X)
+    assert signals.normalize(X, chunk_size=3, out=out) is out
+    assert np.allclose(out, expected, atol=1e-6)
+
+    out = signals.normalize(X, axis=0, chunk_size=4)
+    assert np.allclose(out, signals.normalize(X.astype(np.float64), axis=0), atol=1e-6)
+
+    # Normalizes in place.
+    Y = X.copy()
+    assert signals.normalize(Y, inplace=True) is Y
+    assert np.allclose(Y, expected, atol=1e-6)
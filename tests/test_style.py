@@ -1,7 +1,16 @@
 """Tests style settings."""
 
+import asyncio
+import json
+import os
+import shutil
+import threading
+
+import matplotlib
 import numpy as np
-from matplotlib import rcParams
+import pytest
+from matplotlib import font_manager as fm
+from matplotlib import ft2font, rcParams
 
 from jetplot import style
 
@@ -27,3 +36,194 @@ def test_dark_mode():
             assert np.allclose(rcParams[key], value)
         else:
             assert rcParams[key] == value
+
+
+def test_font_index():
+    fonts = style.available_fonts()
+    assert fonts == sorted({f.name for f in fm.fontManager.ttflist})
+    assert "DejaVu Sans" in fonts
+
+    style.set_font("DejaVu Sans")
+    assert rcParams["font.family"] == ["DejaVu Sans"]
+
+    with pytest.raises(ValueError):
+        style.set_font("Not A Real Font")
+
+
+def test_find_fonts_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("JETPLOT_CACHE_DIR", str(tmp_path / "cache"))
+    fonts = tmp_path / "fonts"
+    (fonts / "nested").mkdir(parents=True)
+
+    src = os.path.join(matplotlib.get_data_path(), "fonts", "ttf", "DejaVuSans.ttf")
+    shutil.copy(src, fonts / "nested")
+    assert style._find_fonts(str(fonts), cache=True) == [
+        str(fonts / "nested" / "DejaVuSans.ttf")
+    ]
+    assert (tmp_path / "cache" / "font_dirs.json").exists()
+
+    # adding a file to a subfolder invalidates the index
+    shutil.copy(src, fonts / "nested" / "Copy.ttf")
+    assert len(style._find_fonts(str(fonts), cache=True)) == 2
+
+
+def test_install_fonts_registry(tmp_path, monkeypatch):
+    monkeypatch.setenv("JETPLOT_CACHE_DIR", str(tmp_path / "cache"))
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+
+    src = os.path.join(matplotlib.get_data_path(), "fonts", "ttf", "DejaVuSans.ttf")
+    shutil.copy(src, fonts / "A.ttf")
+    shutil.copy(src, fonts / "B.ttf")
+    (fonts / "broken.ttf").write_bytes(b"not a font")
+
+    ttflist = list(fm.fontManager.ttflist)
+    try:
+        # identical files are parsed once they are in the registry
+        report = style.install_fonts(str(fonts), max_workers=2)
+        assert len(report.files) == 3
+        assert report.parsed == 2
+        assert list(report.errors) == [str(fonts / "broken.ttf")]
+        assert "DejaVu Sans" in style.available_fonts()
+
+        expected = fm.ttfFontProperty(ft2font.FT2Font(str(fonts / "A.ttf")))
+        registered = [f for f in fm.fontManager.ttflist if f.fname.endswith("A.ttf")]
+        assert registered[0] == expected
+
+        # installing again skips the registered files
+        report = style.install_fonts(str(fonts))
+        assert report.skipped == 2 and report.parsed == 0
+
+        # a new process loads the parsed fonts from the registry
+        fm.fontManager.ttflist = list(ttflist)
+        shutil.copy(src, fonts / "C.ttf")
+        report = style.install_fonts(str(fonts))
+        assert report.cached == 3 and report.parsed == 0
+        assert str(report).startswith("4 font files (3 cached, 0 parsed")
+    finally:
+        fm.fontManager.ttflist = ttflist
+        fm.fontManager._findfont_cached.cache_clear()
+
+
+def test_install_fonts_without_cache(tmp_path, monkeypatch):
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    src = os.path.join(matplotlib.get_data_path(), "fonts", "ttf", "DejaVuSans.ttf")
+    shutil.copy(src, fonts / "A.ttf")
+
+    # the cache directory cannot be created (its parent is a file)
+    (tmp_path / "file").touch()
+    monkeypatch.setenv("JETPLOT_CACHE_DIR", str(tmp_path / "file" / "cache"))
+
+    ttflist = list(fm.fontManager.ttflist)
+    try:
+        assert style.install_fonts(str(fonts)).parsed == 1
+
+        # corrupt cache files are ignored
+        cache = tmp_path / "cache"
+        cache.mkdir()
+        (cache / "font_dirs.json").write_text(json.dumps({str(fonts): []}))
+        (cache / "fonts.json").write_text('{"files": [], "fonts": 1}')
+        monkeypatch.setenv("JETPLOT_CACHE_DIR", str(cache))
+        fm.fontManager.ttflist = list(ttflist)
+        assert style.install_fonts(str(fonts)).parsed == 1
+    finally:
+        fm.fontManager.ttflist = ttflist
+        fm.fontManager._findfont_cached.cache_clear()
+
+
+def _params():
+    # the backend is resolved lazily (from a sentinel), so it is not compared
+    return {k: v for k, v in rcParams.items() if k != "backend"}
+
+
+def test_style():
+    with pytest.raises(ValueError):
+        style.Style({"lines.linewidth": "wide"})
+
+    s = style.Style({"lines.linewidth": "3", "figure.figsize": (2, 1)})
+    assert s.params["lines.linewidth"] == 3.0
+    assert s.params["figure.figsize"] == [2.0, 1.0]
+
+    before = _params()
+    with s:
+        assert rcParams["lines.linewidth"] == 3.0
+        with s | {"lines.linewidth": 4}:
+            assert rcParams["lines.linewidth"] == 4.0
+            assert rcParams["figure.figsize"] == [2.0, 1.0]
+        assert rcParams["lines.linewidth"] == 3.0
+    assert _params() == before
+
+    @s
+    def linewidth():
+        return rcParams["lines.linewidth"]
+
+    assert linewidth() == 3.0
+    assert _params() == before
+
+
+def test_light_dark_style():
+    style.light_mode()
+    light = _params()
+    style.dark_mode()
+    dark = _params()
+
+    assert style.light_style() is style.light_style()
+    with style.light_style():
+        assert _params() == light
+    assert _params() == dark
+
+    style.light_style().apply()
+    assert _params() == light
+
+
+def test_style_threads():
+    before = _params()
+    styles = [style.Style({"lines.linewidth": w}) for w in (1.0, 2.0)]
+
+    def render(s):
+        for _ in range(200):
+            with s:
+                assert rcParams["lines.linewidth"] in (1.0, 2.0)
+
+    threads = [threading.Thread(target=render, args=(s,)) for s in styles]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert _params() == before
+
+
+def test_style_tasks():
+    before = _params()
+    entered, inner_entered, exited = (asyncio.Event() for _ in range(3))
+
+    async def outer():
+        with style.Style({"lines.linewidth": 7.0}):
+            entered.set()
+            await inner_entered.wait()
+        exited.set()
+
+    async def inner():
+        await entered.wait()
+        with style.Style({"lines.linewidth": 3.0}):
+            inner_entered.set()
+            await exited.wait()
+            return rcParams["lines.linewidth"]
+
+    async def main():
+        return await asyncio.gather(outer(), inner())
+
+    # the context that is still active keeps its parameters, and the
+    # parameters from before either context are restored at the end
+    assert asyncio.run(main()) == [None, 3.0]
+    assert _params() == before
+
+
+def test_fast_style():
+    with style.light_style() | style.fast_style() as s:
+        assert s.params["figure.dpi"] == 72
+        assert rcParams["figure.facecolor"] == s.params["figure.facecolor"]
+        for key, value in style.FAST_DEFAULTS.items():
+            assert rcParams[key] == value
@@ -1,10 +1,25 @@
 """Tests for the timepiece module."""
 
+import asyncio
+import gc
+import os
+import threading
 import time
+import tracemalloc
 
 import numpy as np
+import pytest
 
-from jetplot.timepiece import hrtime, profile
+from jetplot import timepiece
+from jetplot.timepiece import (
+    Profiler,
+    RunningStats,
+    Stopwatch,
+    hrtime,
+    hrtime_array,
+    hrtime_formatter,
+    profile,
+)
 
 
 def test_hrtime():
@@ -40,3 +55,245 @@ def test_profile():
     assert np.allclose(wrapper.serr(), 0.0, atol=0.01)
     # pyrefly: ignore  # missing-attribute
     assert wrapper.summary() is None
+
+
+def test_profiler():
+    prof = Profiler()
+
+    @prof
+    def inner():
+        time.sleep(0.01)
+
+    for _ in range(3):
+        with prof.section("outer"):
+            inner()
+
+    tree = prof.to_dict()
+    (outer,) = tree["children"]
+    (child,) = outer["children"]
+
+    assert outer["name"] == "outer"
+    assert outer["count"] == 3
+    assert child["name"] == inner.__qualname__
+    assert child["count"] == 3
+    assert child["min"] <= child["p50"] <= child["max"]
+    assert np.allclose(outer["self"], outer["total"] - child["total"])
+
+    lines = prof.collapsed().splitlines()
+    assert lines[0].startswith("outer ")
+    assert lines[1].startswith(f"outer;{inner.__qualname__} ")
+
+    prof.enabled = False
+    with prof.section("ignored"):
+        inner()
+    assert len(prof.to_dict()["children"]) == 1
+
+
+def test_profiler_tasks():
+    prof = Profiler()
+
+    async def task(name, delay):
+        with prof.section(name):
+            await asyncio.sleep(delay)
+            with prof.section("child"):
+                await asyncio.sleep(delay)
+
+    @prof
+    async def wait():
+        await asyncio.sleep(0.02)
+
+    async def main():
+        with prof.section("request"):
+            await asyncio.gather(task("a", 0.01), task("b", 0.005))
+        await wait()
+
+    asyncio.run(main())
+
+    # decorated coroutine functions are timed until they finish
+    (node,) = [n for n in prof.to_dict()["children"] if n["name"] != "request"]
+    assert node["name"] == wait.__qualname__
+    assert node["total"] >= 0.02
+
+    request = prof.to_dict()["children"][0]
+    a, b = request["children"]
+    assert (a["name"], b["name"]) == ("a", "b")
+    assert [c["name"] for c in a["children"]] == ["child"]
+    assert [c["name"] for c in b["children"]] == ["child"]
+    assert a["total"] >= 0.02 > b["total"] >= 0.01
+
+
+def test_running_stats():
+    rs = np.random.RandomState(0)
+    samples = rs.lognormal(size=5000)
+
+    stats = RunningStats(recent=10)
+    for x in samples:
+        stats.add(x)
+
+    assert stats.count == samples.size
+    assert np.allclose(stats.mean, samples.mean())
+    assert np.allclose(stats.std, samples.std())
+    assert stats.min == samples.min() and stats.max == samples.max()
+    assert np.allclose(stats.recent, samples[-10:])
+    for q in (10, 50, 90, 99):
+        assert np.allclose(stats.percentile(q), np.percentile(samples, q), rtol=0.05)
+
+
+def test_profile_stream():
+    wrapper = profile(stream=True, recent=2)(time.sleep)
+    for _ in range(3):
+        wrapper(0.01)
+
+    assert not hasattr(wrapper, "calls")
+    # pyrefly: ignore  # missing-attribute
+    assert wrapper.stats().count == 3
+    # pyrefly: ignore  # missing-attribute
+    assert wrapper.stats().recent.size == 2
+    # pyrefly: ignore  # missing-attribute
+    assert np.allclose(wrapper.mean(), 0.01, atol=0.01)
+    # pyrefly: ignore  # missing-attribute
+    assert np.allclose(wrapper.percentile(50), 0.01, atol=0.01)
+
+
+def test_profile_stream_threads():
+    @profile(stream=True)
+    def work(n):
+        return sum(range(n))
+
+    stop = threading.Event()
+
+    def run(seed):
+        rs = np.random.RandomState(seed)
+        while not stop.is_set():
+            work(rs.randint(1, 10_000))
+
+    threads = [threading.Thread(target=run, args=(seed,)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        # statistics can be read while the threads are adding samples
+        for _ in range(500):
+            # pyrefly: ignore  # missing-attribute
+            assert work.stats().count >= 0
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def test_running_stats_merge():
+    rs = np.random.RandomState(0)
+    a, b = rs.rand(100), rs.rand(50) + 1
+
+    left, right = RunningStats(recent=10), RunningStats()
+    for x in a:
+        left.add(x)
+    for x in b:
+        right.add(x)
+
+    merged = left.merge(right)
+    samples = np.concatenate([a, b])
+    assert merged.count == 150
+    assert np.allclose(merged.mean, samples.mean())
+    assert np.allclose(merged.std, samples.std())
+    assert np.allclose(merged.recent, a[-10:])
+
+
+def test_profile_threads_and_coroutines():
+    @profile(cpu=True)
+    def work():
+        return sum(range(1000))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # pyrefly: ignore  # missing-attribute
+    assert work.stats().count == 4
+    # pyrefly: ignore  # missing-attribute
+    assert work.cpu_stats().count == 4
+
+    # the statistics of exited threads are folded together, so memory use does
+    # not grow with the number of threads that called the function
+    @profile(stream=True, cpu=True)
+    def streamed():
+        return sum(range(1000))
+
+    def churn(n):
+        for _ in range(n):
+            thread = threading.Thread(target=lambda: [streamed() for _ in range(3)])
+            thread.start()
+            thread.join()
+
+    churn(20)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        churn(200)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert growth < 64 * 1024
+    # pyrefly: ignore  # missing-attribute
+    assert streamed.stats().count == 660
+
+    @profile(cpu=True)
+    async def wait(t):
+        await asyncio.sleep(t)
+        return t
+
+    async def main():
+        return await asyncio.gather(wait(0.05), wait(0.05))
+
+    assert asyncio.run(main()) == [0.05, 0.05]
+    # pyrefly: ignore  # missing-attribute
+    assert np.allclose(wait.mean(), 0.05, atol=0.02)
+    # Time spent awaiting is not CPU time.
+    # pyrefly: ignore  # missing-attribute
+    assert wait.cpu_stats().mean < 0.01
+
+
+def test_stopwatch_memory():
+    nbytes = 2**20 * 8
+    with Stopwatch("test", memory="tracemalloc", verbose=False) as watch:
+        data = np.ones(2**20)
+        first = watch.checkpoint("allocate")
+        del data
+        second = watch.checkpoint("free")
+
+    assert first.peak is not None and first.net is not None
+    assert first.peak >= nbytes
+    assert first.net >= nbytes
+    assert second.net is not None and second.net < 0
+    assert watch.checkpoints == [first, second]
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="requires /proc")
+def test_stopwatch_rss(monkeypatch):
+    # without a way to reset the peak RSS, peaks are not reported
+    monkeypatch.setattr(timepiece, "_reset_rss_peak", lambda: False)
+    with Stopwatch("test", memory="rss", verbose=False) as watch:
+        checkpoint = watch.checkpoint("noop")
+    assert checkpoint.peak is None
+    assert checkpoint.net is not None
+
+
+def test_hrtime_array():
+    rs = np.random.RandomState(0)
+    times = np.concatenate(
+        [
+            10.0 ** rs.uniform(-12, 8, size=500),
+            [0, 1, 60, 1e6, 2e5, 5.25e-4, -1.0, np.inf, np.nan],
+        ]
+    )
+
+    computed = hrtime_array(times.reshape(-1, 1))
+    assert computed.shape == (times.size, 1)
+    assert list(computed.ravel()) == [hrtime(t) for t in times]
+
+    formatter = hrtime_formatter()
+    assert formatter(0.005, 0) == "5 ms"
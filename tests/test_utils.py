@@ -1,10 +1,21 @@
 """Tests chart utilities."""
 
+import gc
+import pickle
+import threading
+import weakref
+from io import BytesIO
 from itertools import product
 
+import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import Collection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 
 from jetplot import chart_utils as cu
+from jetplot import images, plots
 
 
 def test_wrappers():
@@ -107,3 +118,192 @@ def test_xclamp_yclamp():
     assert ax.get_ylim() == (0.0, 4.0)
     assert list(ax.get_yticks()) == [0.0, 1.0, 2.0, 3.0, 4.0]
     plt.close(fig)
+
+
+def test_instrument():
+    @cu.plotwrapper
+    def scatter(n, **kwargs):
+        ax = kwargs["ax"]
+        for k in range(n):
+            ax.plot([0, 1], [k, k])
+        return ax
+
+    with cu.instrument() as records:
+        ax = scatter(3)
+        ax.get_figure().canvas.draw()
+
+    # Calls outside of the block are not recorded.
+    scatter(1)
+
+    (record,) = records
+    assert record.name == "scatter"
+    assert record.prep_time > 0
+    assert record.artists["Line2D"] == 3
+    assert record.draws == 1
+    assert record.draw_time > 0
+
+    # After the block, draws are no longer timed, and the figure can be pickled.
+    draw_time = record.draw_time
+    ax.get_figure().canvas.draw()
+    assert (record.draws, record.draw_time) == (1, draw_time)
+    pickle.loads(pickle.dumps(ax.get_figure()))
+    plt.close("all")
+
+
+def test_auto_rasterize():
+    x = np.linspace(0, 1, 5_000)
+    ys = list(np.random.randn(5, x.size))
+
+    def saved_size(fig):
+        buffer = BytesIO()
+        fig.savefig(buffer, format="pdf")
+        return buffer.tell()
+
+    vector = plots.lines(x, ys)
+    assert not any(a.get_rasterized() for a in vector.findobj())
+
+    raster = plots.lines(x, ys, rasterize=1_000)
+    rasterized = [a for a in raster.findobj() if a.get_rasterized()]
+    assert len(rasterized) == len(ys)
+    assert all(isinstance(a, Line2D) for a in rasterized)
+    assert saved_size(raster.get_figure()) < saved_size(vector.get_figure()) / 2
+
+    with cu.auto_rasterize(1_000):
+        _, ax = plt.subplots()
+        plots.hist2d(np.random.randn(1_000), np.random.randn(1_000), bins=50, ax=ax)
+        # small artists (ticks, spines and text) stay vector graphics
+        small = plots.lines(x[:100], [y[:100] for y in ys])
+    (mesh,) = [a for a in ax.findobj() if a.get_rasterized()]
+    assert isinstance(mesh, Collection)
+    assert not any(a.get_rasterized() for a in small.findobj())
+    plt.close("all")
+
+
+def test_figure_pool():
+    pool = cu.FigurePool(maxsize=1)
+    num_figures = len(plt.get_fignums())
+
+    first = pool.render(plots.hist, np.arange(10), figsize=(2, 1))
+    second = pool.render(plots.hist, np.arange(10), figsize=(2, 1))
+    assert first[:4] == b"\x89PNG" and first == second
+    assert (pool.created, pool.reused) == (1, 1)
+
+    with pool.figure((2, 1)) as fig:
+        assert not fig.axes
+    with pool.figure((3, 1)) as fig:
+        assert tuple(fig.get_size_inches()) == (3, 1)
+    assert pool.created == 2
+
+    with cu.pooled(pool):
+        ax = plots.lines(np.arange(10), [np.arange(10)], figsize=(2, 1))
+        fig = ax.get_figure()
+        pool.save(fig, BytesIO(), format="png")
+
+        # the saved figure is reused, and outstanding figures are released
+        # when the block exits
+        assert (
+            plots.lines(np.arange(10), [np.arange(10)], figsize=(2, 1)).get_figure()
+            is fig
+        )
+        images.img(np.random.randn(5, 5), figsize=(2, 1))
+    assert len(pool._in_use) == 0
+
+    # figures released within the block are not kept alive by it
+    with cu.pooled(cu.FigurePool(maxsize=0)) as unpooled:
+        fig = plots.lines(np.arange(10), [np.arange(10)]).get_figure()
+        ref = weakref.ref(fig)
+        unpooled.save(fig, BytesIO(), format="png")
+        del fig, ax
+        gc.collect()
+        assert ref() is None
+
+    # figures never touch pyplot
+    assert len(plt.get_fignums()) == num_figures
+
+
+def test_instrument_isolation():
+    @cu.plotwrapper
+    def line(**kwargs):
+        kwargs["ax"].plot([0, 1], [0, 1])
+
+    # blocks in other threads do not record this thread's calls
+    other = []
+
+    def worker():
+        with cu.instrument() as records:
+            other.append(records)
+            started.set()
+            finished.wait()
+
+    started, finished = threading.Event(), threading.Event()
+    thread = threading.Thread(target=worker)
+    thread.start()
+    started.wait()
+    line()
+    finished.set()
+    thread.join()
+    assert other == [[]]
+
+    # figures that are cleared and reused only count their own draws
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    with cu.instrument() as records:
+        for _ in range(3):
+            line(fig=fig)
+            fig.savefig(BytesIO(), format="png")
+            fig.clear()
+    assert [r.draws for r in records] == [1, 1, 1]
+    plt.close("all")
+
+
+def test_auto_rasterize_isolation():
+    x = np.linspace(0, 1, 5_000)
+    results = {}
+
+    def worker():
+        with cu.auto_rasterize(1_000):
+            started.set()
+            finished.wait()
+            results["inside"] = plots.lines(x, [x]).get_lines()[0].get_rasterized()
+
+    started, finished = threading.Event(), threading.Event()
+    thread = threading.Thread(target=worker)
+    thread.start()
+    started.wait()
+    results["outside"] = plots.lines(x, [x]).get_lines()[0].get_rasterized()
+    finished.set()
+    thread.join()
+
+    assert results == {"inside": True, "outside": False}
+    plt.close("all")
+
+
+def test_pooled_isolation():
+    pool = cu.FigurePool()
+    x = np.arange(10)
+    other = {}
+
+    def worker():
+        # figures acquired in another thread (even from the same pool) are
+        # neither pooled by this block, nor released when it exits
+        ax = plots.lines(x, [x])
+        other["fig"], other["ax"] = ax.get_figure(), ax
+        other["pooled_fig"] = pool.acquire()
+
+    with cu.pooled(pool):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        ax = plots.lines(x, [x])
+
+    assert other["fig"] not in [fig for fig, _ in pool._in_use.values()]
+    assert other["ax"] in other["fig"].axes
+    assert id(other["pooled_fig"]) in pool._in_use
+    assert id(ax.get_figure()) not in pool._in_use
+
+    # pooled figures only count their own draws
+    with cu.instrument() as records:
+        for _ in range(3):
+            pool.render(plots.lines, x, [x])
+    assert [r.draws for r in records] == [1, 1, 1]
+    plt.close("all")